@@ -2,12 +2,25 @@
 
 
 import os
-import re
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+import hashlib
+import threading
+import time as _time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, stream_with_context
 import bcrypt
-from supabase import create_client, Client
+import httpx
+from postgrest import APIError, SyncPostgrestClient
+from postgrest.utils import SyncClient
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
+from session_store import ServerSideSessionInterface, create_session_store
+from exports import csv_lines, ics_lines
+from slots import AvailabilityIndex, RECURRENCE_KEY, iter_calendar_slots, normalize_recurrence
+from search import DoctorSearchIndex
+from profiles import PROFILE_FORM_FIELDS, build_profile_data, is_valid_email, validate_profile
+from delivery import init_delivery
+from instrumentation import init_instrumentation, instrument_client, metrics_authorized, metrics_payload, timed
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -24,7 +37,7 @@ if not all(required_vars):
     raise ValueError("Des variables d'environnement manquantes. Vérifiez votre fichier .env")
 
 # -------------------------------------------------------------------
-# INIT FLASK + SUPABASE
+# INIT FLASK
 # -------------------------------------------------------------------
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
@@ -33,74 +46,500 @@ app.config.update(
     SESSION_COOKIE_HTTPONLY=True,
     SESSION_COOKIE_SAMESITE="Lax"
 )
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Le cookie ne contient qu'un identifiant ; les données restent côté serveur
+app.session_interface = ServerSideSessionInterface(create_session_store())
+# Server-Timing, histogrammes /metrics et journal des requêtes lentes (instrumentation.py)
+init_instrumentation(app)
+# Assets versionnés, cache de bytecode Jinja et compression gzip/brotli (delivery.py)
+init_delivery(app)
 
-try:
-    test = supabase.table("users").select("count", count="exact").execute()
-    print(f"✅ Connexion à Supabase réussie. Nombre d'utilisateurs : {test.count}")
-except Exception as e:
-    print(f"❌ ERREUR de connexion à Supabase au démarrage : {e}")
+# -------------------------------------------------------------------
+# CLIENT SUPABASE (POSTGREST) : CRÉÉ À LA PREMIÈRE REQUÊTE, CONNEXIONS RÉUTILISÉES
+# -------------------------------------------------------------------
+# Aucun appel réseau à l'import : le démarrage d'un worker ne dépend plus de la
+# latence de la base. Le client est créé après le fork, une fois par processus,
+# et garde ses connexions HTTP ouvertes (keep-alive) entre les requêtes.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))
+READY_CHECK_TTL = float(os.getenv("READY_CHECK_TTL", "5"))
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout):
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=DB_MAX_CONNECTIONS,
+                max_keepalive_connections=DB_MAX_CONNECTIONS
+            )
+        )
+
+_db = None
+_db_lock = threading.Lock()
+
+def get_db():
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = instrument_client(PooledPostgrestClient(
+                    f"{SUPABASE_URL}/rest/v1",
+                    headers={"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"},
+                    timeout=DB_TIMEOUT
+                ))
+    return _db
+
+def use_data_backend(client):
+    """Remplace le client de données (benchmarks, stand-in en mémoire) ; même API table()/execute()."""
+    global _db
+    _db = instrument_client(client)
+
+# Logique partagée avec le mode ASGI (asgi.py) : les vues et lectures communes sont
+# des générateurs qui cèdent leurs requêtes PostgREST au lieu de les exécuter.
+# Une requête seule reçoit sa réponse, une liste reçoit la liste des réponses
+# (exécutées en parallèle en ASGI). run_sync les exécute, asgi.run_async les
+# attend avec await ; une erreur d'exécution est relancée dans le générateur.
+def run_sync(flow):
+    response, error = None, None
+    while True:
+        try:
+            step = flow.throw(error) if error else flow.send(response)
+        except StopIteration as stop:
+            return stop.value
+        response, error = None, None
+        try:
+            response = [query.execute() for query in step] if isinstance(step, list) else step.execute()
+        except Exception as e:
+            error = e
+
+# Dernier contrôle de connectivité : (horodatage, erreur ou None), partagé par les threads
+_ready_state = (0.0, None)
+
+def check_ready():
+    """Requête minimale (une ligne, sans comptage) mise en cache READY_CHECK_TTL secondes."""
+    global _ready_state
+    checked_at, error = _ready_state
+    if _time.monotonic() - checked_at < READY_CHECK_TTL:
+        return error
+    try:
+        get_db().table("users").select("id").limit(1).execute()
+        error = None
+    except Exception as e:
+        print(f"❌ ERREUR de connexion à Supabase : {e}")
+        error = str(e)
+    _ready_state = (_time.monotonic(), error)
+    return error
 
 # -------------------------------------------------------------------
 # UTILITAIRES
 # -------------------------------------------------------------------
-def is_valid_email(email):
-    return re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", email)
-
-def validate_bilingual_data(data):
-    errors = []
-    bilingual_fields = {
-        'nom_fr': 'Nom (Français)',
-        'nom_ar': 'الاسم (عربي)',
-        'prenom_fr': 'Prénom (Français)',
-        'prenom_ar': 'الاسم الأول (عربي)',
-        'specialite_fr': 'Spécialité (Français)',
-        'specialite_ar': 'التخصص (عربي)',
-        'ville_fr': 'Ville (Français)',
-        'ville_ar': 'المدينة (عربي)',
-        'quartier_fr': 'Quartier (Français)',
-        'quartier_ar': 'الحي (عربي)',
-        'adresse_fr': 'Adresse (Français)',
-        'adresse_ar': 'العنوان (عربي)',
-        'type_diplome_fr': 'Type de diplôme (Français)',
-        'type_diplome_ar': 'نوع الشهادة (عربي)',
-        'secteur_fr': 'Secteur (Français)',
-        'secteur_ar': 'القطاع (عربي)',
-        'activite_fr': 'Activité (Français)',
-        'activite_ar': 'النشاط (عربي)'
+def user_fields_query(client, user_id):
+    return client.table("users").select("profile_data").eq("id", user_id)
+
+def remember_user_fields(rows):
+    row = rows[0] if rows else {}
+    session["profile_data"] = row.get("profile_data") or {}
+
+def get_user_field(field):
+    """Charge paresseusement profile_data depuis le store de session, sinon depuis la base.
+
+    Le calendrier n'est pas gardé en session : voir get_calendar (cache par médecin).
+    """
+    if field not in session:
+        try:
+            res = user_fields_query(get_db(), session["user_id"]).execute()
+        except Exception as e:
+            print(f"❌ ERREUR chargement profil utilisateur {session['user_id']}: {e}")
+            return {}
+        remember_user_fields(res.data)
+    return session.get(field) or {}
+
+# -------------------------------------------------------------------
+# MOTS DE PASSE (POOL BCRYPT BORNÉ + COÛT CONFIGURABLE)
+# -------------------------------------------------------------------
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", "4"))
+PASSWORD_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_QUEUE_TIMEOUT", "2"))
+
+# bcrypt relâche le GIL : le pool borne le CPU consommé par worker,
+# le sémaphore borne la file d'attente (au-delà : 429)
+password_pool = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="bcrypt")
+password_slots = threading.BoundedSemaphore(PASSWORD_WORKERS + PASSWORD_QUEUE_SIZE)
+
+class PasswordPoolBusy(Exception):
+    pass
+
+def run_password_task(fn, *args):
+    if not password_slots.acquire(timeout=PASSWORD_QUEUE_TIMEOUT):
+        raise PasswordPoolBusy()
+    try:
+        with timed("bcrypt"):
+            return password_pool.submit(fn, *args).result()
+    finally:
+        password_slots.release()
+
+def _hash_password(pwd):
+    return bcrypt.hashpw(pwd.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def _check_password(pwd, pwd_hash):
+    return bcrypt.checkpw(pwd.encode(), pwd_hash.encode())
+
+def hash_password(pwd):
+    return run_password_task(_hash_password, pwd)
+
+def check_password(pwd, pwd_hash):
+    return run_password_task(_check_password, pwd, pwd_hash)
+
+def password_needs_rehash(pwd_hash):
+    # Format : $2b$<coût>$<sel+hash>
+    try:
+        return int(pwd_hash.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+# -------------------------------------------------------------------
+# RÉSERVATIONS (FENÊTRE DE DATES + PROJECTION PARTAGÉE)
+# -------------------------------------------------------------------
+# Seules les colonnes utilisées par la projection sont récupérées
+RESERVATION_COLUMNS = (
+    "id", "patient_nom", "patient_telephone", "patient_email",
+    "patient_date_reservation", "patient_time_reservation", "status"
+)
+RESERVATION_DURATION = timedelta(minutes=int(os.getenv("RESERVATION_MINUTES", "30")))
+RESERVATIONS_PAGE_SIZE = 500
+
+def parse_date_window(args):
+    """Extrait la fenêtre [start, end) envoyée par FullCalendar (dates ISO, end exclusive)."""
+    window = []
+    for key in ("start", "end"):
+        value = (args.get(key) or "").strip()
+        if not value:
+            window.append(None)
+            continue
+        try:
+            window.append(datetime.fromisoformat(value[:10]).date().isoformat())
+        except ValueError:
+            window.append(None)
+    return tuple(window)
+
+# /calendar/edit : une page = CALENDAR_PAGE_DAYS jours, à partir d'aujourd'hui par défaut
+CALENDAR_PAGE_DAYS = int(os.getenv("CALENDAR_PAGE_DAYS", "30"))
+
+def calendar_page_window(args, today=None):
+    """Fenêtre [start, end) de la page des rendez-vous, avec les fenêtres précédente et suivante."""
+    start, end = parse_date_window(args)
+    first = datetime.fromisoformat(start).date() if start else (today or datetime.now().date())
+    last = datetime.fromisoformat(end).date() if end else None
+    if last is None or last <= first:
+        last = first + timedelta(days=CALENDAR_PAGE_DAYS)
+    span = last - first
+    return {
+        "start": first.isoformat(),
+        "end": last.isoformat(),
+        "last_day": (last - timedelta(days=1)).isoformat(),
+        "prev": {"start": (first - span).isoformat(), "end": first.isoformat()},
+        "next": {"start": last.isoformat(), "end": (last + span).isoformat()}
+    }
+
+def reservations_page_query(client, doctor_id, start, end, offset):
+    """Requête d'une page de réservations ; le client peut être synchrone ou asynchrone."""
+    query = client.table("patients").select(*RESERVATION_COLUMNS).eq("doctor_id", doctor_id)
+    if start:
+        query = query.gte("patient_date_reservation", start)
+    if end:
+        query = query.lt("patient_date_reservation", end)
+    return query.order("patient_date_reservation").order("id") \
+        .range(offset, offset + RESERVATIONS_PAGE_SIZE)
+
+def reservations_flow(db, doctor_id, start=None, end=None):
+    """Récupère les réservations d'un médecin, filtrées et paginées côté base."""
+    rows = []
+    offset = 0
+    while True:
+        page = (yield reservations_page_query(db, doctor_id, start, end, offset)).data or []
+        rows.extend(page)
+        if len(page) < RESERVATIONS_PAGE_SIZE:
+            return rows
+        offset += RESERVATIONS_PAGE_SIZE
+
+def fetch_reservations(doctor_id, start=None, end=None):
+    return run_sync(reservations_flow(get_db(), doctor_id, start, end))
+
+EXPORT_PAGE_SIZE = 1000
+
+def iter_reservations_keyset(doctor_id, start=None, end=None, page_size=EXPORT_PAGE_SIZE):
+    """Parcourt les réservations par clé (date, id) : mémoire constante, première page immédiate.
+
+    (date, id) > (d, i) s'exprime sans filtre OR : d'abord la fin du jour d
+    (date = d et id > i), puis les jours suivants (date > d). Les lignes sans
+    date, triées en dernier et écartées par project_reservation, sont exclues :
+    une page qui finirait sur l'une d'elles donnerait un filtre eq.None.
+    """
+    def base():
+        query = get_db().table("patients").select(*RESERVATION_COLUMNS).eq("doctor_id", doctor_id) \
+            .not_.is_("patient_date_reservation", "null")
+        if end:
+            query = query.lt("patient_date_reservation", end)
+        return query
+
+    query = base()
+    if start:
+        query = query.gte("patient_date_reservation", start)
+    page = query.order("patient_date_reservation").order("id").limit(page_size).execute().data or []
+    while page:
+        yield from page
+        if len(page) < page_size:
+            return
+        last_date, last_id = page[-1]["patient_date_reservation"], page[-1]["id"]
+        page = base().eq("patient_date_reservation", last_date).gt("id", last_id) \
+            .order("id").limit(page_size).execute().data or []
+        if len(page) < page_size:
+            page += base().gt("patient_date_reservation", last_date) \
+                .order("patient_date_reservation").order("id").limit(page_size - len(page)).execute().data or []
+
+def project_reservation(p):
+    """Projection commune d'une ligne patients -> réservation (None si date/heure absentes)."""
+    date = p.get("patient_date_reservation")
+    time = p.get("patient_time_reservation")
+    if not date or not time:
+        return None
+    start = f"{date}T{time}"
+    end = (datetime.fromisoformat(start) + RESERVATION_DURATION).isoformat()
+    return {
+        "patient_id": p["id"],
+        "patient_name": p.get("patient_nom") or "",
+        "patient_phone": p.get("patient_telephone") or "",
+        "patient_email": p.get("patient_email") or "",
+        "start": start,
+        "end": end,
+        "status": p.get("status") or "reserved",
+        "date": str(date),
+        "time": time
+    }
+
+def blocks_slot(r):
+    """Filtre commun aux événements et au contrôle des reports : une réservation annulée libère son créneau."""
+    return r["status"] != "cancelled"
+
+def reservation_event(r):
+    """Événement FullCalendar pour une réservation projetée."""
+    return {
+        "id": f"patient_{r['patient_id']}",
+        "title": r["patient_name"] or "Patient",
+        "start": r["start"],
+        "end": r["end"],
+        "color": "#ffc107",
+        "borderColor": "#e0a800",
+        "textColor": "#212529",
+        "status": "reserved",
+        "extendedProps": {
+            "type": "reservation",
+            "patient_id": r["patient_id"],
+            "patient_name": r["patient_name"],
+            "patient_phone": r["patient_phone"],
+            "patient_email": r["patient_email"],
+            "reservation_status": r["status"],
+            "date": r["date"],
+            "time": r["time"]
+        }
+    }
+
+def slot_event(slot):
+    return {
+        "id": f"slot_{slot['start']}",
+        "title": "Disponible",
+        "start": slot["start"],
+        "end": slot["end"],
+        "color": "#d1ecf1",
+        "borderColor": "#bee5eb",
+        "textColor": "#0c5460",
+        "status": "available",
+        "extendedProps": {"type": "slot"}
+    }
+
+# -------------------------------------------------------------------
+# CACHE DES ÉVÉNEMENTS (LRU + TTL, PAR MÉDECIN ET FENÊTRE)
+# -------------------------------------------------------------------
+class TTLCache:
+    """Cache LRU borné avec expiration, partagé par les threads d'un worker."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < _time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (_time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate):
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+# Clé : (doctor_id, start, end) -> (corps JSON, ETag)
+events_cache = TTLCache(
+    maxsize=int(os.getenv("EVENTS_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("EVENTS_CACHE_TTL", "30"))
+)
+
+def invalidate_doctor_events(doctor_id):
+    events_cache.invalidate(lambda key: key[0] == str(doctor_id))
+
+# Statistiques du tableau de bord, une entrée par médecin ; l'invalidation ne
+# touche que ce worker : même durée de vie que events_cache pour que les autres suivent
+stats_cache = TTLCache(
+    maxsize=int(os.getenv("STATS_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("STATS_CACHE_TTL", os.getenv("EVENTS_CACHE_TTL", "30")))
+)
+
+def invalidate_doctor_stats(doctor_id):
+    stats_cache.invalidate(lambda key: key == str(doctor_id))
+
+# Calendrier (créneaux + règles récurrentes) par médecin : partagé par toutes ses
+# sessions, même durée de vie que events_cache pour que les autres workers suivent
+calendar_cache = TTLCache(
+    maxsize=int(os.getenv("CALENDAR_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CALENDAR_CACHE_TTL", os.getenv("EVENTS_CACHE_TTL", "30")))
+)
+
+def calendar_query(client, doctor_id):
+    return client.table("users").select("calendar").eq("id", doctor_id)
+
+def calendar_from_rows(rows):
+    return (rows[0].get("calendar") if rows else None) or {}
+
+def calendar_flow(db, doctor_id):
+    calendar = calendar_cache.get(str(doctor_id))
+    if calendar is None:
+        calendar = calendar_from_rows((yield calendar_query(db, doctor_id)).data)
+        calendar_cache.set(str(doctor_id), calendar)
+    return calendar
+
+def get_calendar(doctor_id):
+    return run_sync(calendar_flow(get_db(), doctor_id))
+
+def calendar_changed(doctor_id, calendar):
+    """Après enregistrement : le calendrier en cache est remplacé, événements et statistiques recalculés."""
+    calendar_cache.set(str(doctor_id), calendar)
+    invalidate_doctor_events(doctor_id)
+    invalidate_doctor_stats(doctor_id)
+
+# -------------------------------------------------------------------
+# SYNCHRONISATION INCRÉMENTALE (CURSEUR updated_at + PIERRES TOMBALES)
+# -------------------------------------------------------------------
+# updated_at et les pierres tombales des suppressions sont tenus par des
+# déclencheurs en base, y compris pour les écritures de l'application patients ;
+# schéma (table reservation_tombstones, déclencheurs, index) : migrations/001_reservation_tombstones.sql
+DELTA_LIMIT = 500
+SYNC_CURSOR_MARGIN = timedelta(seconds=5)
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "10000"))
+# En WSGI, l'intervalle entre deux reconnexions EST la période d'interrogation
+SSE_POLL_RETRY_MS = int(os.getenv("SSE_POLL_RETRY_MS", "30000"))
+
+class ReservationChanges:
+    """Abonnements par médecin aux modifications de réservations (dans ce processus)."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, doctor_id, callback):
+        with self._lock:
+            self._subscribers.setdefault(str(doctor_id), set()).add(callback)
+
+    def unsubscribe(self, doctor_id, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(str(doctor_id))
+            if callbacks:
+                callbacks.discard(callback)
+                if not callbacks:
+                    del self._subscribers[str(doctor_id)]
+
+    def publish(self, doctor_id):
+        with self._lock:
+            callbacks = list(self._subscribers.get(str(doctor_id), ()))
+        for callback in callbacks:
+            callback()
+
+reservation_changes = ReservationChanges()
+
+def notify_reservations_changed(doctor_id):
+    invalidate_doctor_events(doctor_id)
+    invalidate_doctor_stats(doctor_id)
+    reservation_changes.publish(doctor_id)
+
+def sync_cursor(now=None):
+    """Curseur initial ; la marge absorbe les décalages d'horloge (les correctifs sont idempotents)."""
+    return ((now or datetime.now(timezone.utc)) - SYNC_CURSOR_MARGIN).isoformat()
+
+def parse_sync_cursor(value):
+    try:
+        cursor = datetime.fromisoformat(value.strip().replace(" ", "+"))
+    except (AttributeError, ValueError):
+        return None
+    return (cursor if cursor.tzinfo else cursor.replace(tzinfo=timezone.utc)).isoformat()
+
+def changed_reservations_query(client, doctor_id, since):
+    return client.table("patients").select(*RESERVATION_COLUMNS, "updated_at") \
+        .eq("doctor_id", doctor_id).gt("updated_at", since).order("updated_at").limit(DELTA_LIMIT)
+
+def tombstones_query(client, doctor_id, since):
+    return client.table("reservation_tombstones").select("patient_id", "deleted_at") \
+        .eq("doctor_id", doctor_id).gt("deleted_at", since).order("deleted_at").limit(DELTA_LIMIT)
+
+def build_delta(since, changed, deleted, now=None):
+    """Correctif : réservations modifiées et identifiants supprimés depuis `since`.
+
+    Le curseur suivant n'est pas le plus grand updated_at reçu mais l'instant de
+    la lecture moins SYNC_CURSOR_MARGIN : les lignes d'un même lot (même `now`)
+    écrites après la lecture et celles validées en retard avec un horodatage
+    antérieur sont relues au correctif suivant. Une ligne n'est renvoyée en
+    double que pendant la marge. `reset` demande au client de tout recharger
+    quand le correctif est tronqué.
+    """
+    changed, deleted = changed or [], deleted or []
+    return {
+        "cursor": max(datetime.fromisoformat(since), datetime.fromisoformat(sync_cursor(now))).isoformat(),
+        "reset": len(changed) >= DELTA_LIMIT or len(deleted) >= DELTA_LIMIT,
+        "upserts": [reservation_event(r) for r in map(project_reservation, changed) if r],
+        "deleted": [f"patient_{row['patient_id']}" for row in deleted]
     }
-    for field, label in bilingual_fields.items():
-        if not data.get(field, '').strip():
-            errors.append(f"{label} est obligatoire")
-    standard_fields = {'tel': 'Téléphone', 'email': 'Email'}
-    for field, label in standard_fields.items():
-        if not data.get(field, '').strip():
-            errors.append(f"{label} est obligatoire")
-    return errors
-
-def has_arabic_characters(text):
-    arabic_pattern = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
-    return bool(arabic_pattern.search(text))
-
-def has_french_characters(text):
-    french_pattern = re.compile(r'[a-zA-ZàâäéèêëïîôöùûüÿçÀÂÄÉÈÊËÏÎÔÖÙÛÜŸÇ]')
-    return bool(french_pattern.search(text))
-
-def validate_language_content(data):
-    errors = []
-    french_fields = ['nom_fr', 'prenom_fr', 'specialite_fr', 'ville_fr', 'quartier_fr',
-                     'adresse_fr', 'type_diplome_fr', 'secteur_fr', 'activite_fr']
-    for field in french_fields:
-        value = data.get(field, '').strip()
-        if value and not has_french_characters(value):
-            errors.append(f"Le champ {field.replace('_fr', ' (Français)')} doit contenir du texte en français")
-    arabic_fields = ['nom_ar', 'prenom_ar', 'specialite_ar', 'ville_ar', 'quartier_ar',
-                     'adresse_ar', 'type_diplome_ar', 'secteur_ar', 'activite_ar']
-    for field in arabic_fields:
-        value = data.get(field, '').strip()
-        if value and not has_arabic_characters(value):
-            errors.append(f"Le champ {field.replace('_ar', ' (العربية)')} doit contenir du texte en arabe")
-    return errors
+
+def delta_flow(db, doctor_id, since):
+    now = datetime.now(timezone.utc)
+    changed, deleted = yield [
+        changed_reservations_query(db, doctor_id, since),
+        tombstones_query(db, doctor_id, since)
+    ]
+    return build_delta(since, changed.data, deleted.data, now)
+
+def fetch_delta(doctor_id, since):
+    return run_sync(delta_flow(get_db(), doctor_id, since))
+
+def sse_message(delta):
+    return f"event: patch\nid: {delta['cursor']}\ndata: {app.json.dumps(delta)}\n\n"
+
+def delta_has_changes(delta):
+    return bool(delta["upserts"] or delta["deleted"] or delta["reset"])
 
 # -------------------------------------------------------------------
 # ROUTES PRINCIPALES
@@ -128,11 +567,11 @@ def register():
             flash("Le mot de passe doit faire au moins 6 caractères.", "error")
             return render_template("register.html")
         try:
-            exists = supabase.table("users").select("id").eq("email", email).execute()
+            exists = get_db().table("users").select("id").eq("email", email).execute()
             if exists.data and len(exists.data) > 0:
                 flash("Email déjà utilisé.", "error")
                 return render_template("register.html")
-            pwd_hash = bcrypt.hashpw(pwd.encode(), bcrypt.gensalt()).decode()
+            pwd_hash = hash_password(pwd)
             user_data = {
                 "email": email,
                 "password_hash": pwd_hash,
@@ -142,18 +581,33 @@ def register():
                 "profile_data": {},
                 "calendar": {}
             }
-            result = supabase.table("users").insert(user_data).execute()
+            result = get_db().table("users").insert(user_data).execute()
             if not result.data or len(result.data) == 0:
                 flash("Erreur inconnue lors de l'inscription. Veuillez réessayer.", "error")
                 return render_template("register.html")
             flash("Inscription réussie ! Connectez-vous maintenant.", "success")
             return redirect(url_for("login"))
+        except PasswordPoolBusy:
+            flash("Serveur occupé. Veuillez réessayer dans quelques instants.", "error")
+            return render_template("register.html"), 429
         except Exception as e:
             print(f"❌ ERREUR lors de l'inscription de {email}: {type(e).__name__}: {e}")
             flash("Erreur technique lors de l'inscription. Veuillez réessayer plus tard.", "error")
             return render_template("register.html")
     return render_template("register.html")
 
+def upgrade_password_hash(user_id, pwd):
+    """Réécrit le hash au coût configuré ; un échec n'empêche pas la connexion."""
+    try:
+        get_db().table("users").update({
+            "password_hash": hash_password(pwd),
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }).eq("id", user_id).execute()
+    except PasswordPoolBusy:
+        pass
+    except Exception as e:
+        print(f"❌ ERREUR mise à jour du hash utilisateur {user_id}: {e}")
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
@@ -163,16 +617,17 @@ def login():
             flash("Email et mot de passe requis.", "error")
             return render_template("login.html")
         try:
-            res = supabase.table("users").select("*").eq("email", email).execute()
+            res = get_db().table("users").select("id", "password_hash", "language").eq("email", email).execute()
             if res.data and len(res.data) > 0:
                 user = res.data[0]
-                if bcrypt.checkpw(pwd.encode(), user["password_hash"].encode()):
+                if check_password(pwd, user["password_hash"]):
+                    if password_needs_rehash(user["password_hash"]):
+                        upgrade_password_hash(user["id"], pwd)
+                    session.regenerate()
                     session.update({
                         "user_id": user["id"],
                         "email": email,
-                        "language": user.get("language", "both"),
-                        "profile_data": user.get("profile_data", {}),
-                        "calendar": user.get("calendar", {})
+                        "language": user.get("language", "both")
                     })
                     flash("Connexion réussie.", "success")
                     return redirect(url_for("dashboard"))
@@ -180,6 +635,9 @@ def login():
                     flash("Identifiants invalides.", "error")
             else:
                 flash("Identifiants invalides.", "error")
+        except PasswordPoolBusy:
+            flash("Serveur occupé. Veuillez réessayer dans quelques instants.", "error")
+            return render_template("login.html"), 429
         except Exception as e:
             print(f"❌ ERREUR lors de la connexion de {email}: {e}")
             flash("Erreur technique. Veuillez réessayer.", "error")
@@ -189,47 +647,28 @@ def login():
 def dashboard():
     if "user_id" not in session:
         return redirect(url_for("login"))
-    return render_template("dashboard.html", profile_data=session.get("profile_data", {}), calendar=session.get("calendar", {}))
+    return render_template("dashboard.html", profile_data=get_user_field("profile_data"), sync_cursor=sync_cursor())
 
 @app.route("/profile/edit", methods=["GET", "POST"])
 def edit_profile():
     if "user_id" not in session:
         return redirect(url_for("login"))
     if request.method == "POST":
-        data = {k: request.form.get(k, "").strip() for k in [
-            "nom_fr", "nom_ar", "prenom_fr", "prenom_ar",
-            "specialite_fr", "specialite_ar", "ville_fr", "ville_ar",
-            "quartier_fr", "quartier_ar", "adresse_fr", "adresse_ar",
-            "type_diplome_fr", "type_diplome_ar", "secteur_fr", "secteur_ar",
-            "activite_fr", "activite_ar", "tel", "email"
-        ]}
-        validation_errors = validate_bilingual_data(data)
-        language_errors = validate_language_content(data)
-        all_errors = validation_errors + language_errors
+        data = {k: request.form.get(k, "").strip() for k in PROFILE_FORM_FIELDS}
+        all_errors = validate_profile(data)
         if all_errors:
             for error in all_errors:
                 flash(error, "error")
             return render_template("edit_profile.html", data=data)
         try:
-            updated_profile_data = {
-                "nom": {"fr": data["nom_fr"], "ar": data["nom_ar"]},
-                "prenom": {"fr": data["prenom_fr"], "ar": data["prenom_ar"]},
-                "specialite": {"fr": data["specialite_fr"], "ar": data["specialite_ar"]},
-                "ville": {"fr": data["ville_fr"], "ar": data["ville_ar"]},
-                "quartier": {"fr": data["quartier_fr"], "ar": data["quartier_ar"]},
-                "adresse": {"fr": data["adresse_fr"], "ar": data["adresse_ar"]},
-                "type_diplome": {"fr": data["type_diplome_fr"], "ar": data["type_diplome_ar"]},
-                "secteur": {"fr": data["secteur_fr"], "ar": data["secteur_ar"]},
-                "activite": {"fr": data["activite_fr"], "ar": data["activite_ar"]},
-                "tel": data["tel"],
-                "email": data["email"]
-            }
-            result = supabase.table("users").update({
+            updated_profile_data = build_profile_data(data)
+            result = get_db().table("users").update({
                 "profile_data": updated_profile_data,
                 "updated_at": datetime.now(timezone.utc).isoformat()
             }).eq("id", session["user_id"]).execute()
             if result.data and len(result.data) > 0:
                 session["profile_data"] = updated_profile_data
+                doctor_index.update(session["user_id"], updated_profile_data)
                 session["email"] = data["email"]
                 flash("Profil mis à jour avec succès.", "success")
                 return redirect(url_for("dashboard"))
@@ -238,7 +677,7 @@ def edit_profile():
         except Exception as e:
             print(f"❌ ERREUR mise à jour profil utilisateur {session['user_id']}: {e}")
             flash("Erreur technique lors de la mise à jour.", "error")
-    profile_data = session.get("profile_data", {})
+    profile_data = get_user_field("profile_data")
     form_data = {}
     for field in ["nom", "prenom", "specialite", "ville", "quartier", "adresse",
                   "type_diplome", "secteur", "activite"]:
@@ -250,187 +689,542 @@ def edit_profile():
     return render_template("edit_profile.html", data=form_data)
 
 # ✅ Route corrigée : récupère les réservations depuis patients
-@app.route("/calendar/edit", methods=["GET"])
-def edit_calendar():
+def edit_calendar_flow(db):
     if "user_id" not in session:
         return redirect(url_for("login"))
     
     try:
         doctor_id = session["user_id"]
-        patients_resp = supabase.table("patients").select("*").eq("doctor_id", doctor_id).execute()
-        reservations = []
-        if patients_resp.data:
-            for p in patients_resp.data:
-                date = p.get("patient_date_reservation")
-                time = p.get("patient_time_reservation")
-                if not date or not time:
-                    continue
-                start_iso = f"{date}T{time}"
-                end_dt = datetime.fromisoformat(start_iso) + timedelta(minutes=30)
-                end_iso = end_dt.isoformat()
-                reservations.append({
-                    "patient_id": p["id"],
-                    "patient_name": p.get("patient_nom", "Patient"),
-                    "patient_phone": p.get("patient_telephone", "Non fourni"),
-                    "patient_email": p.get("patient_email", "Non fourni"),
-                    "start": start_iso,
-                    "end": end_iso,
-                    "status": p.get("status", "reserved"),
-                    "date": str(date),
-                    "time": time
-                })
-        return render_template("edit_calendar.html", reservations=reservations)
+        window = calendar_page_window(request.args)
+        rows = yield from reservations_flow(db, doctor_id, window["start"], window["end"])
+        reservations = [r for r in map(project_reservation, rows) if r]
+        return render_template("edit_calendar.html", reservations=reservations, window=window)
     except Exception as e:
         print(f"❌ ERREUR chargement réservations: {e}")
         flash("Erreur lors du chargement des rendez-vous.", "error")
         return redirect(url_for("dashboard"))
 
+@app.route("/calendar/edit", methods=["GET"])
+def edit_calendar():
+    return run_sync(edit_calendar_flow(get_db()))
+
 # -------------------------------------------------------------------
 # API - GESTION DES RENDEZ-VOUS
 # -------------------------------------------------------------------
+def build_events(rows, start, end, calendar):
+    reservations = [r for r in map(project_reservation, rows) if r]
+    availability = AvailabilityIndex(iter_calendar_slots(calendar, start, end), filter(blocks_slot, reservations))
+
+    # Créneaux disponibles : masqués dès qu'une réservation les chevauche
+    events = [slot_event(slot) for slot in availability.free_slots(start, end)]
+    events.extend(reservation_event(r) for r in reservations)
+    return events
+
+def cache_events(key, events):
+    body = app.json.dumps(events)
+    cached = (body, hashlib.sha256(body.encode()).hexdigest())
+    events_cache.set(key, cached)
+    return cached
+
+def events_response(cached):
+    body, etag = cached
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+def events_flow(db):
+    doctor_id = session.get("user_id")
+    if not doctor_id:
+        return jsonify([])
+
+    if "since" in request.args:
+        since = parse_sync_cursor(request.args["since"])
+        if not since:
+            return jsonify({"error": "Curseur invalide"}), 400
+        try:
+            return jsonify((yield from delta_flow(db, doctor_id, since)))
+        except Exception as e:
+            print(f"❌ ERREUR synchronisation événements: {e}")
+            return jsonify({"error": "Erreur technique"}), 500
+
+    start, end = parse_date_window(request.args)
+    key = (str(doctor_id), start, end)
+    cached = events_cache.get(key)
+    if cached is None:
+        try:
+            rows = yield from reservations_flow(db, doctor_id, start, end)
+            calendar = yield from calendar_flow(db, doctor_id)
+            cached = cache_events(key, build_events(rows, start, end, calendar))
+        except Exception as e:
+            print(f"❌ ERREUR chargement événements: {e}")
+            return jsonify([])
+    return events_response(cached)
+
 @app.route("/api/events")
 def api_events():
-    if "user_id" not in session:
-        return jsonify([])
+    return run_sync(events_flow(get_db()))
+
+# Statistiques agrégées : count="exact" sur une ligne au plus. Pas de HEAD
+# (select() sans colonne) : postgrest 0.11 ne lit pas Content-Range sur une
+# réponse vide et renvoie count=0.
+# Un statut NULL est compté « reserved », comme dans project_reservation : eq/neq
+# excluent NULL, d'où le comptage séparé et la semaine calculée par différence.
+STATS_STATUSES = ("reserved", "confirmed", "rescheduled", "cancelled")
+
+def stats_queries(client, doctor_id, today=None):
+    today = today or datetime.now().date()
+    week_end = today + timedelta(days=7 - today.weekday())
 
+    def count():
+        return client.table("patients").select("id", count="exact").eq("doctor_id", doctor_id).limit(1)
+
+    def week():
+        return count().gte("patient_date_reservation", today.isoformat()) \
+            .lt("patient_date_reservation", week_end.isoformat())
+
+    queries = {"total_patients": count()}
+    for status in STATS_STATUSES:
+        queries[status] = count().eq("status", status)
+    queries["no_status"] = count().is_("status", "null")
+    queries["upcoming_week"] = week()
+    queries["upcoming_week_cancelled"] = week().eq("status", "cancelled")
+    return queries
+
+def build_stats(counts, calendar):
+    by_status = {status: counts[status] or 0 for status in STATS_STATUSES}
+    by_status["reserved"] += counts["no_status"] or 0
+    return {
+        "total_patients": counts["total_patients"] or 0,
+        "appointments": sum(n for status, n in by_status.items() if status != "cancelled"),
+        "by_status": by_status,
+        "upcoming_week": (counts["upcoming_week"] or 0) - (counts["upcoming_week_cancelled"] or 0),
+        "weeks_programmed": sum(1 for slots in calendar.values() if isinstance(slots, list))
+    }
+
+def stats_flow(db):
     doctor_id = session.get("user_id")
     if not doctor_id:
-        return jsonify([])
+        return jsonify({"error": "Non autorisé"}), 401
+    stats = stats_cache.get(str(doctor_id))
+    if stats is None:
+        queries = stats_queries(db, doctor_id)
+        try:
+            responses = yield list(queries.values())
+            calendar = yield from calendar_flow(db, doctor_id)
+        except Exception as e:
+            print(f"❌ ERREUR statistiques: {e}")
+            return jsonify({"error": "Erreur technique"}), 500
+        stats = build_stats({name: resp.count for name, resp in zip(queries, responses)}, calendar)
+        stats_cache.set(str(doctor_id), stats)
+    return jsonify(stats)
 
+@app.route("/api/stats")
+def api_stats():
+    return run_sync(stats_flow(get_db()))
+
+# Flux SSE : en WSGI, ce n'est qu'une interrogation périodique (polling). Chaque
+# connexion envoie le correctif en attente puis se ferme ; EventSource revient après
+# SSE_POLL_RETRY_MS avec Last-Event-ID = curseur, soit 2 requêtes par onglet visible
+# et par période (dashboard.js ferme le flux quand l'onglet est masqué).
+# Le mode ASGI (asgi.py) garde la connexion ouverte et pousse les changements.
+@app.route("/api/events/stream")
+def api_events_stream():
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé"}), 401
+    since = parse_sync_cursor(request.headers.get("Last-Event-ID") or request.args.get("since") or "") or sync_cursor()
     try:
-        # Réservations
-        patients_resp = supabase.table("patients").select("*").eq("doctor_id", doctor_id).execute()
-        reserved_events = {}
-        if patients_resp.data:
-            for p in patients_resp.data:
-                date = p.get("patient_date_reservation")
-                time = p.get("patient_time_reservation")
-                if not date or not time:
-                    continue
-                start = f"{date}T{time}"
-                end_dt = datetime.fromisoformat(start) + timedelta(minutes=30)
-                end = end_dt.isoformat()
-                reserved_events[start] = {
-                    "id": f"patient_{p['id']}",
-                    "title": f"{p.get('patient_nom', 'Patient')}",
-                    "start": start,
-                    "end": end,
-                    "color": "#ffc107",
-                    "borderColor": "#e0a800",
-                    "textColor": "#212529",
-                    "status": "reserved",
-                    "extendedProps": {
-                        "type": "reservation",
-                        "patient_id": p["id"],
-                        "patient_name": p.get("patient_nom", ""),
-                        "patient_phone": p.get("patient_telephone", ""),
-                        "patient_email": p.get("patient_email", ""),
-                        "date": str(date),
-                        "time": time
-                    }
-                }
-
-        # Créneaux disponibles
-        events = []
-        calendar = session.get("calendar", {})
-        for week_date, slots in calendar.items():
-            if not isinstance(slots, list):
-                continue
-            for slot in slots:
-                if isinstance(slot, dict) and "start" in slot:
-                    start = slot["start"]
-                    if start in reserved_events:
-                        continue
-                    events.append({
-                        "id": f"slot_{start}",
-                        "title": "Disponible",
-                        "start": start,
-                        "end": slot["end"],
-                        "color": "#d1ecf1",
-                        "borderColor": "#bee5eb",
-                        "textColor": "#0c5460",
-                        "status": "available",
-                        "extendedProps": {"type": "slot"}
-                    })
+        delta = fetch_delta(session["user_id"], since)
+    except Exception as e:
+        print(f"❌ ERREUR flux événements: {e}")
+        delta = None
+    body = sse_message(delta) if delta and delta_has_changes(delta) else ""
+    return app.response_class(
+        body + f"retry: {SSE_POLL_RETRY_MS}\n\n",
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        events.extend(reserved_events.values())
-        return jsonify(events)
+# Export en flux (CSV ou ICS) de tout l'historique, ou d'une fenêtre start/end
+EXPORT_FORMATS = {
+    "csv": (csv_lines, "text/csv; charset=utf-8"),
+    "ics": (ics_lines, "text/calendar; charset=utf-8"),
+}
 
-    except Exception as e:
-        print(f"❌ ERREUR chargement événements: {e}")
-        return jsonify([])
+@app.route("/api/reservations/export")
+def api_reservations_export():
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé"}), 401
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "Format non supporté (csv ou ics)"}), 400
+    render_lines, mimetype = EXPORT_FORMATS[fmt]
+    doctor_id = session["user_id"]
+    start, end = parse_date_window(request.args)
+    rows = iter_reservations_keyset(doctor_id, start, end)
+    reservations = (r for r in map(project_reservation, rows) if r)
+    return app.response_class(
+        stream_with_context(render_lines(reservations)),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="rendez-vous.{fmt}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
-# ✅ Confirmer
-@app.route("/api/confirm_reservation/<patient_id>", methods=["POST"])
-def api_confirm_reservation(patient_id):
+# Règles de disponibilité récurrentes (stockées dans calendar["recurrence"])
+@app.route("/api/availability/rules", methods=["GET", "PUT"])
+def api_availability_rules():
     if "user_id" not in session:
         return jsonify({"error": "Non autorisé"}), 401
+    doctor_id = session["user_id"]
+    if request.method == "GET":
+        try:
+            calendar = get_calendar(doctor_id)
+        except Exception as e:
+            print(f"❌ ERREUR chargement des règles {doctor_id}: {e}")
+            return jsonify({"error": "Erreur technique"}), 500
+        return jsonify(calendar.get(RECURRENCE_KEY) or {"rules": [], "exceptions": []})
     try:
-        # Vérifier que le patient existe et appartient au médecin
-        doctor_id = session["user_id"]
-        check = supabase.table("patients").select("id").eq("id", patient_id).eq("doctor_id", doctor_id).execute()
-        if not check.data or len(check.data) == 0:
-            return jsonify({"error": "Rendez-vous non trouvé"}), 404
-
-        supabase.table("patients").update({
-            "status": "confirmed",
+        recurrence = normalize_recurrence(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        # Lecture fraîche (pas le cache) : on ne réécrit pas un calendrier périmé
+        calendar = dict(calendar_from_rows(calendar_query(get_db(), doctor_id).execute().data))
+        calendar[RECURRENCE_KEY] = recurrence
+        get_db().table("users").update({
+            "calendar": calendar,
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }).eq("id", patient_id).execute()
-        return jsonify({"message": "Rendez-vous confirmé"})
+        }).eq("id", doctor_id).execute()
     except Exception as e:
-        print(f"❌ ERREUR confirmation: {e}")
+        print(f"❌ ERREUR enregistrement des règles {doctor_id}: {e}")
         return jsonify({"error": "Erreur technique"}), 500
+    calendar_changed(doctor_id, calendar)
+    return jsonify(recurrence)
 
-# 🔄 Reporter
-@app.route("/api/reschedule_reservation/<patient_id>", methods=["POST"])
-def api_reschedule_reservation(patient_id):
-    if "user_id" not in session:
-        return jsonify({"error": "Non autorisé"}), 401
-    data = request.get_json()
-    new_date = data.get("new_date")
-    new_time = data.get("new_time")
-    if not new_date or not new_time:
-        return jsonify({"error": "Nouvelle date et heure requises"}), 400
+# Opérations groupées : chaque écriture est filtrée par doctor_id, les lignes
+# renvoyées par PostgREST tiennent lieu de contrôle d'appartenance
+RESERVATION_ACTIONS = ("confirm", "reschedule", "delete")
+MAX_BATCH_OPERATIONS = 200
+
+def reschedule_start(op):
+    """Début ISO du nouveau créneau d'un report, None si date/heure invalides."""
     try:
-        doctor_id = session["user_id"]
-        check = supabase.table("patients").select("id").eq("id", patient_id).eq("doctor_id", doctor_id).execute()
-        if not check.data or len(check.data) == 0:
-            return jsonify({"error": "Rendez-vous non trouvé"}), 404
+        return datetime.fromisoformat(f"{op['new_date']}T{op['new_time']}").isoformat()
+    except (KeyError, TypeError, ValueError):
+        return None
 
-        supabase.table("patients").update({
+def reschedule_dates(operations):
+    return sorted({
+        op["new_date"] for op in operations
+        if isinstance(op, dict) and op.get("action") == "reschedule" and reschedule_start(op)
+    })
+
+def booked_reservations_query(client, doctor_id, dates):
+    """Réservations existantes aux dates visées par des reports (contrôle des conflits)."""
+    return client.table("patients").select(*RESERVATION_COLUMNS) \
+        .eq("doctor_id", doctor_id).in_("patient_date_reservation", dates)
+
+def plan_reservation_operations(client, doctor_id, operations, booked=()):
+    """Valide les opérations et prépare les écritures ensemblistes : (résultats, écritures).
+
+    `booked` contient les réservations des dates visées par les reports ;
+    un report qui chevaucherait l'une d'elles (ou un autre report du lot) est refusé en 409.
+    Un rendez-vous ne peut figurer qu'une fois par lot : les écritures ensemblistes
+    s'exécutent dans un ordre arbitraire, les occurrences suivantes sont refusées en 409.
+    """
+    results = [None] * len(operations)
+    confirms, deletes, reschedules = {}, {}, {}
+    moves = []
+    seen = set()
+    for i, op in enumerate(operations):
+        action = op.get("action") if isinstance(op, dict) else None
+        patient_id = str(op.get("patient_id") or "") if isinstance(op, dict) else ""
+        duplicate = patient_id in seen
+        seen.add(patient_id)
+        if action not in RESERVATION_ACTIONS or not patient_id:
+            results[i] = {"patient_id": patient_id, "action": action, "ok": False, "status": 400, "error": "Opération invalide"}
+        elif duplicate:
+            results[i] = {"patient_id": patient_id, "action": action, "ok": False, "status": 409, "error": "Rendez-vous déjà présent dans le lot"}
+        elif action == "confirm":
+            confirms.setdefault(patient_id, []).append(i)
+        elif action == "delete":
+            deletes.setdefault(patient_id, []).append(i)
+        elif not op.get("new_date") or not op.get("new_time"):
+            results[i] = {"patient_id": patient_id, "action": action, "ok": False, "status": 400, "error": "Nouvelle date et heure requises"}
+        elif not reschedule_start(op):
+            results[i] = {"patient_id": patient_id, "action": action, "ok": False, "status": 400, "error": "Date ou heure invalide"}
+        else:
+            moves.append((i, patient_id, op))
+
+    # Les créneaux libérés par les reports et suppressions du lot ne bloquent pas
+    moving = {patient_id for _, patient_id, _ in moves} | set(deletes)
+    availability = AvailabilityIndex(reservations=[
+        r for r in map(project_reservation, booked or [])
+        if r and str(r["patient_id"]) not in moving and blocks_slot(r)
+    ])
+    for i, patient_id, op in moves:
+        start = reschedule_start(op)
+        end = (datetime.fromisoformat(start) + RESERVATION_DURATION).isoformat()
+        if availability.conflicts(start, end):
+            results[i] = {"patient_id": patient_id, "action": "reschedule", "ok": False, "status": 409, "error": "Créneau déjà réservé"}
+            continue
+        availability.book(start, end)
+        reschedules.setdefault((op["new_date"], op["new_time"]), {}).setdefault(patient_id, []).append(i)
+
+    now = datetime.now(timezone.utc).isoformat()
+    writes = []
+    if confirms:
+        writes.append(("confirm", confirms, client.table("patients").update({
+            "status": "confirmed",
+            "updated_at": now
+        })))
+    for (new_date, new_time), targets in reschedules.items():
+        writes.append(("reschedule", targets, client.table("patients").update({
             "patient_date_reservation": new_date,
             "patient_time_reservation": new_time,
             "status": "rescheduled",
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }).eq("id", patient_id).execute()
-        return jsonify({"message": "Rendez-vous reporté"})
+            "updated_at": now
+        })))
+    if deletes:
+        writes.append(("delete", deletes, client.table("patients").delete()))
+
+    return results, [
+        (action, targets, query.eq("doctor_id", doctor_id).in_("id", list(targets)))
+        for action, targets, query in writes
+    ]
+
+def record_write_results(results, action, targets, rows):
+    """Reporte les lignes renvoyées par une écriture ; True si au moins une a changé."""
+    found = {str(row["id"]) for row in (rows or [])}
+    for patient_id, indexes in targets.items():
+        for i in indexes:
+            if patient_id in found:
+                results[i] = {"patient_id": patient_id, "action": action, "ok": True, "status": 200}
+            else:
+                results[i] = {"patient_id": patient_id, "action": action, "ok": False, "status": 404, "error": "Rendez-vous non trouvé"}
+    return bool(found)
+
+# Violations de la contrainte d'exclusion patients_no_overlap
+# (migrations/002_reservation_no_overlap.sql) et d'un éventuel index unique
+SLOT_CONFLICT_CODES = ("23P01", "23505")
+
+def record_slot_conflict(results, action, targets):
+    """Un report concurrent a pris le créneau entre le contrôle et l'écriture : 409."""
+    for patient_id, indexes in targets.items():
+        for i in indexes:
+            results[i] = {"patient_id": patient_id, "action": action, "ok": False, "status": 409, "error": "Créneau déjà réservé"}
+
+def reservation_operations_flow(db, doctor_id, operations):
+    """Applique confirm/reschedule/delete en écritures ensemblistes ; un résultat par opération.
+
+    Le contrôle des conflits ci-dessous évite un aller-retour inutile, mais seule
+    la contrainte d'exclusion de la base tranche entre deux reports simultanés
+    vers le même créneau : sa violation est renvoyée en 409.
+    """
+    dates = reschedule_dates(operations)
+    booked = (yield booked_reservations_query(db, doctor_id, dates)).data if dates else []
+    results, writes = plan_reservation_operations(db, doctor_id, operations, booked)
+    changed = False
+    try:
+        for action, targets, query in writes:
+            try:
+                rows = (yield query).data
+            except APIError as e:
+                if e.code not in SLOT_CONFLICT_CODES:
+                    raise
+                record_slot_conflict(results, action, targets)
+                continue
+            changed = record_write_results(results, action, targets, rows) or changed
+    finally:
+        # Même si une écriture suivante échoue, les précédentes sont visibles
+        if changed:
+            notify_reservations_changed(doctor_id)
+    return results
+
+def apply_reservation_operations(doctor_id, operations):
+    return run_sync(reservation_operations_flow(get_db(), doctor_id, operations))
+
+def batch_operations(data):
+    """Extrait la liste d'opérations d'un corps JSON : (opérations, message d'erreur)."""
+    if not isinstance(data, dict):
+        return None, "Corps JSON invalide"
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return None, "Liste d'opérations requise"
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return None, f"Maximum {MAX_BATCH_OPERATIONS} opérations par requête"
+    return operations, None
+
+def single_reservation_flow(db, operation, message):
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé"}), 401
+    try:
+        result = (yield from reservation_operations_flow(db, session["user_id"], [operation]))[0]
     except Exception as e:
-        print(f"❌ ERREUR report: {e}")
+        print(f"❌ ERREUR {operation['action']}: {e}")
         return jsonify({"error": "Erreur technique"}), 500
+    if not result["ok"]:
+        return jsonify({"error": result["error"]}), result["status"]
+    return jsonify({"message": message})
 
-# 🗑️ Supprimer
-@app.route("/api/delete_reservation/<patient_id>", methods=["DELETE"])
-def api_delete_reservation(patient_id):
+def reservations_batch_flow(db):
     if "user_id" not in session:
         return jsonify({"error": "Non autorisé"}), 401
+    operations, error = batch_operations(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({"error": error}), 400
     try:
-        doctor_id = session["user_id"]
-        check = supabase.table("patients").select("id").eq("id", patient_id).eq("doctor_id", doctor_id).execute()
-        if not check.data or len(check.data) == 0:
-            return jsonify({"error": "Rendez-vous non trouvé"}), 404
-
-        supabase.table("patients").delete().eq("id", patient_id).execute()
-        return jsonify({"message": "Rendez-vous supprimé"})
+        results = yield from reservation_operations_flow(db, session["user_id"], operations)
     except Exception as e:
-        print(f"❌ ERREUR suppression: {e}")
+        print(f"❌ ERREUR opérations groupées: {e}")
         return jsonify({"error": "Erreur technique"}), 500
+    return jsonify({"results": results})
+
+def confirm_reservation_flow(db, patient_id):
+    return single_reservation_flow(db, {"action": "confirm", "patient_id": patient_id}, "Rendez-vous confirmé")
+
+def reschedule_reservation_flow(db, patient_id):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    return single_reservation_flow(db, {
+        "action": "reschedule",
+        "patient_id": patient_id,
+        "new_date": data.get("new_date"),
+        "new_time": data.get("new_time")
+    }, "Rendez-vous reporté")
+
+def delete_reservation_flow(db, patient_id):
+    return single_reservation_flow(db, {"action": "delete", "patient_id": patient_id}, "Rendez-vous supprimé")
+
+@app.route("/api/reservations/batch", methods=["POST"])
+def api_reservations_batch():
+    return run_sync(reservations_batch_flow(get_db()))
+
+# ✅ Confirmer
+@app.route("/api/confirm_reservation/<patient_id>", methods=["POST"])
+def api_confirm_reservation(patient_id):
+    return run_sync(confirm_reservation_flow(get_db(), patient_id))
+
+# 🔄 Reporter
+@app.route("/api/reschedule_reservation/<patient_id>", methods=["POST"])
+def api_reschedule_reservation(patient_id):
+    return run_sync(reschedule_reservation_flow(get_db(), patient_id))
+
+# 🗑️ Supprimer
+@app.route("/api/delete_reservation/<patient_id>", methods=["DELETE"])
+def api_delete_reservation(patient_id):
+    return run_sync(delete_reservation_flow(get_db(), patient_id))
+
+# -------------------------------------------------------------------
+# RECHERCHE DE MÉDECINS (INDEX EN MÉMOIRE PAR WORKER, RAFRAÎCHI PAR updated_at)
+# -------------------------------------------------------------------
+# Premier appel : chargement complet des profils ; ensuite, toutes les
+# SEARCH_REFRESH_SECONDS, seuls les profils modifiés depuis le dernier
+# updated_at vu (y compris par les autres workers ou import_doctors.py),
+# moins SYNC_CURSOR_MARGIN comme pour le flux des réservations : une écriture
+# validée en retard avec un horodatage antérieur n'est pas perdue, et réindexer
+# un profil déjà vu est idempotent.
+# edit_profile met aussi l'index du worker courant à jour immédiatement.
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "30"))
+SEARCH_PAGE_SIZE = 1000
+SEARCH_MAX_RESULTS = 100
+
+doctor_index = DoctorSearchIndex()
+_search_state = {"watermark": None, "refreshed_at": None}
+_search_refresh_lock = threading.Lock()
+
+def search_since(watermark):
+    if not watermark:
+        return None
+    try:
+        return (datetime.fromisoformat(watermark) - SYNC_CURSOR_MARGIN).isoformat()
+    except ValueError:
+        return watermark
+
+def doctors_changed_query(client, since, offset):
+    query = client.table("users").select("id", "profile_data", "updated_at")
+    if since:
+        query = query.gte("updated_at", since)
+    return query.order("updated_at").order("id").range(offset, offset + SEARCH_PAGE_SIZE)
+
+def refresh_doctor_index():
+    """Bloquant tant que l'index n'a jamais été chargé ; sinon un seul thread rafraîchit, les autres lisent l'index courant."""
+    initial = _search_state["refreshed_at"] is None
+    if not _search_refresh_lock.acquire(blocking=initial):
+        return
+    try:
+        if initial and _search_state["refreshed_at"] is not None:
+            return
+        watermark, offset = _search_state["watermark"], 0
+        since = search_since(watermark)
+        while True:
+            rows = doctors_changed_query(get_db(), since, offset).execute().data or []
+            for row in rows:
+                doctor_index.update(row["id"], row.get("profile_data"))
+                if row.get("updated_at") and (watermark is None or row["updated_at"] > watermark):
+                    watermark = row["updated_at"]
+            if len(rows) < SEARCH_PAGE_SIZE:
+                break
+            offset += SEARCH_PAGE_SIZE
+        _search_state.update(watermark=watermark, refreshed_at=_time.monotonic())
+    finally:
+        _search_refresh_lock.release()
+
+@app.route("/api/doctors/search")
+def api_doctors_search():
+    query = request.args.get("q", "").strip()
+    specialite = request.args.get("specialite", "").strip()
+    ville = request.args.get("ville", "").strip()
+    if not (query or specialite or ville):
+        return jsonify({"error": "Paramètre q, specialite ou ville requis"}), 400
+    try:
+        limit = min(max(int(request.args.get("limit", "20")), 1), SEARCH_MAX_RESULTS)
+    except ValueError:
+        return jsonify({"error": "Paramètre limit invalide"}), 400
+    refreshed_at = _search_state["refreshed_at"]
+    if refreshed_at is None or _time.monotonic() - refreshed_at >= SEARCH_REFRESH_SECONDS:
+        try:
+            refresh_doctor_index()
+        except Exception as e:
+            print(f"❌ ERREUR rafraîchissement de l'index de recherche: {e}")
+            if _search_state["refreshed_at"] is None:
+                return jsonify({"error": "Erreur technique"}), 503
+    results = doctor_index.search(query, specialite, ville, limit)
+    response = jsonify({"results": results, "count": len(results)})
+    response.headers["Cache-Control"] = "public, max-age=30"
+    return response
 
 # -------------------------------------------------------------------
 # AUTRES ROUTES
 # -------------------------------------------------------------------
+@app.route("/metrics")
+def metrics():
+    if not metrics_authorized(request.headers):
+        return jsonify({"error": "Non autorisé"}), 401
+    body, content_type = metrics_payload()
+    return app.response_class(body, content_type=content_type)
+
+# Sondes de la plateforme : /healthz (processus vivant, sans réseau)
+# et /readyz (base joignable, prêt à recevoir du trafic)
+@app.route("/healthz")
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route("/readyz")
+def readyz():
+    error = check_ready()
+    if error:
+        return jsonify({"status": "indisponible", "error": "Base de données injoignable"}), 503
+    return jsonify({"status": "ok"})
+
 @app.route("/logout")
 def logout():
     session.clear()
+    session.regenerate()
     flash("Déconnexion réussie.", "info")
     return redirect(url_for("login"))
 
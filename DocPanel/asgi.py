@@ -0,0 +1,292 @@
+# -------------------------------------------------------------------
+# MODE ASGI : ROUTES /api/* ET /calendar/edit EN ASYNCHRONE
+# -------------------------------------------------------------------
+# Lancement :
+#   uvicorn asgi:app --host 0.0.0.0 --port $PORT
+#   gunicorn asgi:app -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT
+#
+# Les routes listées dans ASYNC_ROUTES sont servies sur la boucle d'événements
+# avec un client PostgREST asynchrone, par les mêmes vues que app.py (générateurs
+# *_flow exécutés ici avec await) ; toutes les autres passent par l'application
+# Flask (WSGI) inchangée. Le contexte de requête Flask est
+# conservé : session, hooks before/after_request, url_for, flash et templates
+# fonctionnent comme en WSGI. Le flux SSE /api/events/stream reste ouvert
+# (events_stream) au lieu de se fermer après chaque correctif.
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import request, session, jsonify
+from postgrest import AsyncPostgrestClient
+from postgrest.utils import AsyncClient
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+
+import app as wsgi
+from instrumentation import instrument_client
+from app import (
+    SUPABASE_URL, SUPABASE_KEY, SSE_RETRY_MS,
+    edit_calendar_flow, events_flow, stats_flow, reservations_batch_flow,
+    confirm_reservation_flow, reschedule_reservation_flow, delete_reservation_flow,
+    delta_flow, reservation_changes, sync_cursor, parse_sync_cursor, sse_message, delta_has_changes
+)
+
+flask_app = wsgi.app
+ASYNC_DB_MAX_CONNECTIONS = int(os.getenv("ASYNC_DB_MAX_CONNECTIONS", "200"))
+SSE_POLL_SECONDS = float(os.getenv("SSE_POLL_SECONDS", "15"))
+SSE_MAX_SECONDS = float(os.getenv("SSE_MAX_SECONDS", "300"))
+WSGI_FALLBACK_THREADS = int(os.getenv("WSGI_FALLBACK_THREADS", "16"))
+
+# -------------------------------------------------------------------
+# CLIENT POSTGREST ASYNCHRONE (UN PAR PROCESSUS, CONNEXIONS RÉUTILISÉES)
+# -------------------------------------------------------------------
+class PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout):
+        return AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=ASYNC_DB_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_DB_MAX_CONNECTIONS
+            )
+        )
+
+_db = None
+
+def get_async_db():
+    global _db
+    if _db is None:
+        _db = instrument_client(PooledAsyncPostgrestClient(
+            f"{SUPABASE_URL}/rest/v1",
+            headers={"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"}
+        ))
+    return _db
+
+def use_async_data_backend(client):
+    """Remplace le client asynchrone (benchmarks) ; même API table()/await execute()."""
+    global _db
+    _db = instrument_client(client)
+
+async def close_async_db():
+    global _db
+    if _db is not None:
+        await _db.aclose()
+        _db = None
+
+# -------------------------------------------------------------------
+# VUES PARTAGÉES AVEC app.py, EXÉCUTÉES AVEC AWAIT
+# -------------------------------------------------------------------
+async def run_async(flow):
+    """Pendant asynchrone de app.run_sync : même générateur, requêtes attendues."""
+    response, error = None, None
+    while True:
+        try:
+            step = flow.throw(error) if error else flow.send(response)
+        except StopIteration as stop:
+            return stop.value
+        response, error = None, None
+        try:
+            if isinstance(step, list):
+                response = await asyncio.gather(*(query.execute() for query in step))
+            else:
+                response = await step.execute()
+        except Exception as e:
+            error = e
+
+def async_view(flow):
+    async def view(**args):
+        return await run_async(flow(get_async_db(), **args))
+    return view
+
+async def fetch_delta(doctor_id, since):
+    return await run_async(delta_flow(get_async_db(), doctor_id, since))
+
+ASYNC_ROUTES = Map([
+    Rule("/calendar/edit", methods=["GET"], endpoint=async_view(edit_calendar_flow)),
+    Rule("/api/events", methods=["GET"], endpoint=async_view(events_flow)),
+    Rule("/api/stats", methods=["GET"], endpoint=async_view(stats_flow)),
+    Rule("/api/reservations/batch", methods=["POST"], endpoint=async_view(reservations_batch_flow)),
+    Rule("/api/confirm_reservation/<patient_id>", methods=["POST"], endpoint=async_view(confirm_reservation_flow)),
+    Rule("/api/reschedule_reservation/<patient_id>", methods=["POST"], endpoint=async_view(reschedule_reservation_flow)),
+    Rule("/api/delete_reservation/<patient_id>", methods=["DELETE"], endpoint=async_view(delete_reservation_flow)),
+])
+
+# -------------------------------------------------------------------
+# FLUX SSE : CONNEXION OUVERTE, POUSSÉE IMMÉDIATE DANS CE PROCESSUS,
+# INTERROGATION PÉRIODIQUE POUR LES CHANGEMENTS VENUS D'AUTRES WORKERS
+# -------------------------------------------------------------------
+async def wait_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+async def events_stream(scope, receive, send):
+    with flask_app.request_context(build_environ(scope, b"")):
+        doctor_id = session.get("user_id")
+        since = parse_sync_cursor(request.headers.get("Last-Event-ID") or request.args.get("since") or "") or sync_cursor()
+    if not doctor_id:
+        with flask_app.request_context(build_environ(scope, b"")):
+            response = flask_app.make_response((jsonify({"error": "Non autorisé"}), 401))
+        return await send_response(send, response, scope["method"])
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ],
+    })
+
+    async def push(text):
+        await send({"type": "http.response.body", "body": text.encode(), "more_body": True})
+
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    on_change = lambda: loop.call_soon_threadsafe(wake.set)  # noqa: E731
+    reservation_changes.subscribe(doctor_id, on_change)
+    disconnected = asyncio.create_task(wait_disconnect(receive))
+    deadline = loop.time() + SSE_MAX_SECONDS
+    try:
+        await push(f"retry: {SSE_RETRY_MS}\n\n")
+        while not disconnected.done() and loop.time() < deadline:
+            wake.clear()
+            try:
+                delta = await fetch_delta(doctor_id, since)
+            except Exception as e:
+                print(f"❌ ERREUR flux événements: {e}")
+                delta = None
+            if delta and delta_has_changes(delta):
+                since = delta["cursor"]
+                await push(sse_message(delta))
+            else:
+                await push(": ping\n\n")
+            waiter = asyncio.create_task(wake.wait())
+            await asyncio.wait({waiter, disconnected}, timeout=SSE_POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+        if not disconnected.done():
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        reservation_changes.unsubscribe(doctor_id, on_change)
+        disconnected.cancel()
+
+# -------------------------------------------------------------------
+# ADAPTATEUR ASGI
+# -------------------------------------------------------------------
+def build_environ(scope, body):
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_NAME": scope.get("server", ("localhost", 80))[0],
+        "SERVER_PORT": str(scope.get("server", ("localhost", 80))[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1")
+        if name == "content-length":
+            key = "CONTENT_LENGTH"
+        elif name == "content-type":
+            key = "CONTENT_TYPE"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+async def dispatch(view, args, environ):
+    """Équivalent asynchrone de Flask.full_dispatch_request pour une vue coroutine."""
+    with flask_app.request_context(environ):
+        try:
+            rv = flask_app.preprocess_request()
+            if rv is None:
+                rv = await view(**args)
+            response = flask_app.make_response(rv)
+        except Exception as e:
+            try:
+                response = flask_app.make_response(flask_app.handle_user_exception(e))
+            except Exception as e:
+                response = flask_app.handle_exception(e)
+        return flask_app.process_response(response)
+
+async def send_response(send, response, method):
+    await send({
+        "type": "http.response.start",
+        "status": response.status_code,
+        "headers": [(k.lower().encode("latin1"), v.encode("latin1")) for k, v in response.headers.items()],
+    })
+    try:
+        # Comme Response.get_app_iter en WSGI : pas de corps pour HEAD, 1xx, 204 et 304
+        if method != "HEAD" and not (100 <= response.status_code < 200 or response.status_code in (204, 304)):
+            for chunk in response.iter_encoded():
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    finally:
+        response.close()
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_db()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+# Routes Flask non listées (connexion, pages, exports, statiques...) : WsgiToAsgi
+# les exécuterait une à une sur un seul thread (thread_sensitive=True) ; elles
+# passent ici par un vrai pool, comme les threads d'un worker gthread
+wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_FALLBACK_THREADS, thread_name_prefix="wsgi")
+
+class ThreadedWsgiInstance(WsgiToAsgiInstance):
+    run_wsgi_app = sync_to_async(
+        WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False, executor=wsgi_executor
+    )
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await ThreadedWsgiInstance(self.wsgi_application)(scope, receive, send)
+
+wsgi_fallback = ThreadedWsgiToAsgi(flask_app)
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] == "http":
+        if scope["path"] == "/api/events/stream" and scope["method"] == "GET":
+            return await events_stream(scope, receive, send)
+        try:
+            view, args = ASYNC_ROUTES.bind("localhost").match(scope["path"], method=scope["method"])
+        except HTTPException:
+            view = None
+        if view is not None:
+            environ = build_environ(scope, await read_body(receive))
+            response = await dispatch(view, args, environ)
+            return await send_response(send, response, scope["method"])
+    return await wsgi_fallback(scope, receive, send)
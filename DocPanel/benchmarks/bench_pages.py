@@ -0,0 +1,81 @@
+# -------------------------------------------------------------------
+# POIDS DES PAGES ET TEMPS JUSQU'AU PREMIER OCTET (STAND-IN EN MÉMOIRE)
+# -------------------------------------------------------------------
+# Usage : python benchmarks/bench_pages.py [--runs 50] [--latency 0]
+#
+# Pour chaque page : taille du HTML (identity / gzip / br), taille des
+# ressources /static/ référencées (première visite uniquement : elles sont
+# ensuite servies depuis le cache du navigateur) et TTFB médian mesuré
+# côté serveur (réponse prête, corps non consommé).
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from load_test import PASSWORD, configure_environment, seed  # noqa: E402
+
+PAGES = ("/login", "/register", "/dashboard", "/profile/edit", "/calendar/edit", "/api/events")
+ENCODINGS = ("identity", "gzip", "br")
+STATIC_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Poids des pages et TTFB de DocPanel")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="latence injectée par appel (ms)")
+    parser.add_argument("--patients", type=int, default=500)
+    args = parser.parse_args()
+    args.doctors, args.bcrypt_rounds, args.no_cache = 1, 4, False
+    return args
+
+def fetch(client, url, encoding):
+    response = client.get(url, headers={"Accept-Encoding": encoding})
+    return response.status_code, len(response.get_data()), response.get_data(as_text=encoding == "identity")
+
+def ttfb(client, url, encoding, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        response = client.get(url, headers={"Accept-Encoding": encoding}, buffered=False)
+        samples.append((time.perf_counter() - t0) * 1000)
+        response.close()
+    return statistics.median(samples)
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    import app as appmod
+    from fake_supabase import FakeSupabase
+
+    backend = FakeSupabase(latency_ms=args.latency)
+    appmod.use_data_backend(backend)
+    doctor = seed(backend, args, random.Random(1))[0]
+    client = appmod.app.test_client()
+    client.post("/login", data={"email": doctor["email"], "password": PASSWORD})
+
+    print(f"{'page':<16}{'HTML':>9}{'gzip':>9}{'br':>9}{'static':>10}{'static gz':>11}"
+          f"{'TTFB ms':>9}{'TTFB gz':>9}")
+    for url in PAGES:
+        sizes = {}
+        for encoding in ENCODINGS:
+            status, size, body = fetch(client, url, encoding)
+            sizes[encoding] = size
+            if encoding == "identity":
+                html = body
+        assets = {encoding: 0 for encoding in ("identity", "gzip")}
+        for asset in sorted(set(STATIC_RE.findall(html))):
+            for encoding in assets:
+                assets[encoding] += fetch(client, asset, encoding)[1]
+        print(f"{url:<16}{sizes['identity']:>9}{sizes['gzip']:>9}{sizes['br']:>9}"
+              f"{assets['identity']:>10}{assets['gzip']:>11}"
+              f"{ttfb(client, url, 'identity', args.runs):>9.2f}{ttfb(client, url, 'gzip', args.runs):>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# -------------------------------------------------------------------
+# BENCHMARK DU MOTEUR DE DISPONIBILITÉ (slots.py)
+# -------------------------------------------------------------------
+# Usage : python benchmarks/bench_slots.py [nombre_de_créneaux ...]
+#
+# Compare l'index d'intervalles au parcours linéaire historique
+# (comparaison de chaque créneau à chaque réservation) pour :
+#   - construire l'index,
+#   - lister les créneaux libres d'une semaine,
+#   - tester 1000 reports (conflit ou non).
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slots import AvailabilityIndex, parse_datetime  # noqa: E402
+
+SLOT = timedelta(minutes=30)
+ORIGIN = datetime(2024, 1, 1, 8, 0)
+
+def generate(n_slots, booking_ratio=0.4, seed=42):
+    """n_slots créneaux de 30 min (16 par jour) et une fraction réservée, parfois décalée de 15 min."""
+    rng = random.Random(seed)
+    slots = []
+    for k in range(n_slots):
+        start = ORIGIN + timedelta(days=k // 16) + SLOT * (k % 16)
+        slots.append({"start": start.isoformat(), "end": (start + SLOT).isoformat()})
+    reservations = []
+    for slot in rng.sample(slots, int(n_slots * booking_ratio)):
+        start = parse_datetime(slot["start"]) + timedelta(minutes=rng.choice((0, 0, 0, 15)))
+        reservations.append({"start": start.isoformat(), "end": (start + SLOT).isoformat()})
+    return slots, reservations
+
+def naive_free_slots(slots, reservations, start, end):
+    booked = [(parse_datetime(r["start"]), parse_datetime(r["end"])) for r in reservations]
+    for slot in slots:
+        s, e = parse_datetime(slot["start"]), parse_datetime(slot["end"])
+        if start <= s < end and not any(bs < e and be > s for bs, be in booked):
+            yield slot
+
+def naive_conflicts(reservations, start, end):
+    return any(
+        parse_datetime(r["start"]) < end and parse_datetime(r["end"]) > start
+        for r in reservations
+    )
+
+def timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat * 1000, result
+
+def run(n_slots):
+    slots, reservations = generate(n_slots)
+    days = n_slots // 16
+    week_start = ORIGIN.replace(hour=0) + timedelta(days=days // 2)
+    week_end = week_start + timedelta(days=7)
+    rng = random.Random(7)
+    probes = [ORIGIN + timedelta(days=rng.randrange(days), minutes=15 * rng.randrange(32)) for _ in range(1000)]
+
+    build_ms, index = timed(lambda: AvailabilityIndex(slots, reservations))
+    week_ms, free = timed(lambda: list(index.free_slots(week_start, week_end)), repeat=20)
+    check_ms, hits = timed(lambda: sum(index.conflicts(p, p + SLOT) for p in probes))
+
+    naive_week_ms, naive_free = timed(lambda: list(naive_free_slots(slots, reservations, week_start, week_end)))
+    sample = probes[:20]
+    naive_check_ms, naive_hits = timed(lambda: sum(naive_conflicts(reservations, p, p + SLOT) for p in sample))
+    naive_check_ms *= len(probes) / len(sample)
+
+    assert free == naive_free
+    assert sum(index.conflicts(p, p + SLOT) for p in sample) == naive_hits
+
+    print(f"{n_slots:>7} créneaux / {len(reservations):>6} réservations")
+    print(f"  construction de l'index        : {build_ms:9.2f} ms")
+    print(f"  créneaux libres (1 semaine)    : {week_ms:9.3f} ms   (linéaire : {naive_week_ms:9.2f} ms)")
+    print(f"  1000 contrôles de conflit      : {check_ms:9.3f} ms   (linéaire : {naive_check_ms:9.2f} ms, extrapolé)")
+    print(f"  {len(free)} créneaux libres, {hits} conflits détectés")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for size in sizes:
+        run(size)
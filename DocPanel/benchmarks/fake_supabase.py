@@ -0,0 +1,252 @@
+# -------------------------------------------------------------------
+# STAND-IN SUPABASE EN MÉMOIRE (SOUS-ENSEMBLE POSTGREST UTILISÉ PAR app.py)
+# -------------------------------------------------------------------
+# table(name).select/insert/update/delete + eq/neq/gt/gte/lt/lte/in_/is_/not_
+# + order/range/limit + execute(), avec count="exact" et une latence
+# injectée par appel pour simuler l'aller-retour réseau. Les déclencheurs de
+# migrations/001_reservation_tombstones.sql sont reproduits sur `patients`.
+import asyncio
+import copy
+import itertools
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+# Colonnes indexées : le premier filtre eq() sur l'une d'elles évite le parcours complet
+# (elles ne doivent pas être modifiées par update(), ce que app.py ne fait pas)
+INDEXED_COLUMNS = ("id", "doctor_id", "email")
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, backend, table):
+        self.backend = backend
+        self.table = table
+        self.operation = "select"
+        self.columns = ("*",)
+        self.count = None
+        self.payload = None
+        self.filters = []
+        self.indexed = None
+        self.ordering = []
+        self.offset = 0
+        self.size = None
+        self.negate = False
+
+    # --- opérations -------------------------------------------------
+    def select(self, *columns, count=None):
+        self.operation, self.columns, self.count = "select", columns, count
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def update(self, payload, **kwargs):
+        self.operation, self.payload = "update", payload
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = "delete"
+        return self
+
+    # --- filtres ----------------------------------------------------
+    def _filter(self, column, predicate):
+        negate, self.negate = self.negate, False
+        self.filters.append(lambda row: predicate(row.get(column)) != negate)
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def is_(self, column, value):
+        expected = {"null": None, "true": True, "false": False}[str(value).lower()]
+        return self._filter(column, lambda v: v is expected)
+
+    def eq(self, column, value):
+        if self.indexed is None and not self.negate and column in INDEXED_COLUMNS:
+            self.indexed = (column, str(value))
+            return self
+        return self._filter(column, lambda v: v is not None and str(v) == str(value))
+
+    def neq(self, column, value):
+        return self._filter(column, lambda v: str(v) != str(value))
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v is not None and str(v) > str(value))
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v is not None and str(v) >= str(value))
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v is not None and str(v) < str(value))
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v is not None and str(v) <= str(value))
+
+    def in_(self, column, values):
+        values = {str(v) for v in values}
+        return self._filter(column, lambda v: str(v) in values)
+
+    def order(self, column, *, desc=False, **kwargs):
+        self.ordering.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        # Même convention que postgrest-py : fin exclusive
+        self.offset, self.size = start, end - start
+        return self
+
+    def limit(self, size, **kwargs):
+        self.size = size
+        return self
+
+    # --- exécution --------------------------------------------------
+    def _run(self):
+        return self.backend.run(self)
+
+    def execute(self):
+        self.backend.wait()
+        return self._run()
+
+
+class AsyncFakeQuery(FakeQuery):
+    async def execute(self):
+        await self.backend.async_wait()
+        return self._run()
+
+
+class FakeSupabase:
+    """Base en mémoire partagée par threads ; `calls` compte les allers-retours."""
+
+    query_class = FakeQuery
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tables = {}
+        self.indexes = {}
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._rng = random.Random(seed)
+
+    def table(self, name):
+        return self.query_class(self, name)
+
+    def async_client(self):
+        """Vue asynchrone sur les mêmes données (mode ASGI)."""
+        backend = self
+
+        class AsyncView:
+            def table(self, name):
+                return AsyncFakeQuery(backend, name)
+
+            async def aclose(self):
+                pass
+
+        return AsyncView()
+
+    def _delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000
+
+    def wait(self):
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+
+    async def async_wait(self):
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+    # --- stockage ---------------------------------------------------
+    def next_id(self):
+        return next(self._ids)
+
+    def seed(self, table, rows):
+        with self._lock:
+            for row in rows:
+                self._insert_row(table, dict(row))
+
+    def _insert_row(self, table, row):
+        row.setdefault("id", self.next_id())
+        self.tables.setdefault(table, []).append(row)
+        for column in INDEXED_COLUMNS:
+            if row.get(column) is not None:
+                self.indexes.setdefault((table, column), {}).setdefault(str(row[column]), []).append(row)
+        return row
+
+    def _remove_rows(self, table, rows):
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.tables.get(table, []) if id(row) not in doomed]
+        for column in INDEXED_COLUMNS:
+            index = self.indexes.get((table, column), {})
+            for row in rows:
+                bucket = index.get(str(row.get(column)))
+                if bucket:
+                    bucket[:] = [r for r in bucket if id(r) not in doomed]
+
+    def _candidates(self, query):
+        if query.indexed:
+            column, value = query.indexed
+            return self.indexes.get((query.table, column), {}).get(value, [])
+        return self.tables.get(query.table, [])
+
+    # --- déclencheurs (migrations/001) ------------------------------
+    def _touch(self, table, row):
+        if table == "patients":
+            row["updated_at"] = datetime.now(timezone.utc).isoformat()
+        return row
+
+    def _record_tombstones(self, table, rows):
+        if table == "patients":
+            now = datetime.now(timezone.utc).isoformat()
+            for row in rows:
+                self._insert_row("reservation_tombstones", {
+                    "patient_id": str(row["id"]), "doctor_id": str(row.get("doctor_id")), "deleted_at": now
+                })
+
+    def run(self, query):
+        with self._lock:
+            self.calls += 1
+            if query.operation == "insert":
+                payload = query.payload if isinstance(query.payload, list) else [query.payload]
+                return FakeResponse([
+                    copy.deepcopy(self._insert_row(query.table, self._touch(query.table, dict(row))))
+                    for row in payload
+                ])
+
+            rows = [row for row in self._candidates(query) if all(f(row) for f in query.filters)]
+            if query.operation == "update":
+                for row in rows:
+                    row.update(copy.deepcopy(query.payload))
+                    self._touch(query.table, row)
+                return FakeResponse(copy.deepcopy(rows))
+            if query.operation == "delete":
+                self._remove_rows(query.table, rows)
+                self._record_tombstones(query.table, rows)
+                return FakeResponse(copy.deepcopy(rows))
+
+            for column, desc in reversed(query.ordering):
+                rows.sort(key=lambda row: (row.get(column) is None, str(row.get(column))), reverse=desc)
+            count = len(rows) if query.count else None
+            rows = rows[query.offset:query.offset + query.size if query.size is not None else None]
+            columns = [c for c in query.columns if c not in ("*", "count")]
+            if "*" in query.columns:
+                data = copy.deepcopy(rows)
+            elif columns:
+                data = [{c: copy.deepcopy(row.get(c)) for c in columns} for row in rows]
+            else:
+                # select() sans colonne = requête HEAD : postgrest 0.11 y perd le comptage
+                return FakeResponse([], 0 if query.count else None)
+            return FakeResponse(data, count)
@@ -0,0 +1,238 @@
+# -------------------------------------------------------------------
+# TEST DE CHARGE HORS LIGNE (STAND-IN SUPABASE EN MÉMOIRE)
+# -------------------------------------------------------------------
+# Usage :
+#   python benchmarks/load_test.py --doctors 20 --patients 2000 \
+#       --requests 300 --concurrency 8 --latency 15
+#   python benchmarks/load_test.py --asgi ...      # via asgi.py (boucle d'événements)
+#   python benchmarks/load_test.py --no-cache ...  # caches /api/events et /api/stats désactivés
+#
+# Chaque scénario est joué séparément ; on rapporte p50/p95/p99, le débit
+# et le nombre moyen d'appels à la base par requête.
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+PASSWORD = "bench-password"
+SCENARIOS = ("login", "dashboard", "events", "edit_calendar", "stats",
+             "confirm", "reschedule", "batch", "delete")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne de DocPanel")
+    parser.add_argument("--doctors", type=int, default=10)
+    parser.add_argument("--patients", type=int, default=1000, help="patients par médecin")
+    parser.add_argument("--requests", type=int, default=200, help="requêtes par scénario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=10.0, help="latence injectée par appel (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="variation de latence (ms)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--asgi", action="store_true", help="servir via asgi.py")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+def configure_environment(args):
+    os.environ.setdefault("SUPABASE_URL", "http://bench.invalid")
+    os.environ.setdefault("SUPABASE_KEY", "bench.offline.key")
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ["SESSION_BACKEND"] = "memory"
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    if args.no_cache:
+        os.environ["EVENTS_CACHE_TTL"] = "0"
+        os.environ["STATS_CACHE_TTL"] = "0"
+
+# -------------------------------------------------------------------
+# JEU DE DONNÉES
+# -------------------------------------------------------------------
+PROFILE = {
+    "nom": {"fr": "Bennani", "ar": "بناني"},
+    "prenom": {"fr": "Salma", "ar": "سلمى"},
+    "specialite": {"fr": "Cardiologie", "ar": "أمراض القلب"},
+    "ville": {"fr": "Casablanca", "ar": "الدار البيضاء"},
+    "quartier": {"fr": "Maârif", "ar": "المعاريف"},
+    "tel": "0600000000",
+}
+
+def seed(backend, args, rng):
+    import bcrypt
+
+    pwd_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=args.bcrypt_rounds)).decode()
+    today = date.today()
+    monday = today - timedelta(days=today.weekday())
+    now = datetime.now(timezone.utc).isoformat()
+    statuses = ("reserved", "reserved", "confirmed", "rescheduled", "cancelled")
+    doctors = []
+    for d in range(args.doctors):
+        doctor_id = backend.next_id()
+        calendar = {
+            monday.isoformat(): [
+                {"start": f"{monday + timedelta(days=k)}T{h:02d}:{m:02d}:00",
+                 "end": (datetime.fromisoformat(f"{monday + timedelta(days=k)}T{h:02d}:{m:02d}:00") + timedelta(minutes=30)).isoformat()}
+                for k in range(5) for h in range(9, 12) for m in (0, 30)
+            ],
+            "recurrence": {
+                "rules": [
+                    {"weekdays": [0, 1, 2, 3, 4], "start": "09:00", "end": "12:00", "slot_minutes": 30, "from": None, "until": None},
+                    {"weekdays": [0, 1, 2, 3], "start": "14:00", "end": "17:00", "slot_minutes": 30, "from": None, "until": None},
+                ],
+                "exceptions": [],
+            },
+        }
+        backend.seed("users", [{
+            "id": doctor_id,
+            "email": f"doctor{d}@bench.local",
+            "password_hash": pwd_hash,
+            "language": "both",
+            "profile_data": PROFILE,
+            "calendar": calendar,
+        }])
+        patients = []
+        for p in range(args.patients):
+            day = today + timedelta(days=rng.randint(-180, 60))
+            patients.append({
+                "id": backend.next_id(),
+                "doctor_id": doctor_id,
+                "patient_nom": f"Patient {d}-{p}",
+                "patient_telephone": f"06{rng.randint(10000000, 99999999)}",
+                "patient_email": f"patient{d}.{p}@bench.local",
+                "patient_date_reservation": day.isoformat(),
+                "patient_time_reservation": f"{rng.choice((9, 10, 11, 14, 15, 16)):02d}:{rng.choice((0, 30)):02d}:00",
+                "status": rng.choice(statuses),
+                "updated_at": now,
+            })
+        backend.seed("patients", patients)
+        doctors.append({"id": doctor_id, "email": f"doctor{d}@bench.local", "patients": [p["id"] for p in patients]})
+    return doctors
+
+# -------------------------------------------------------------------
+# SCÉNARIOS : (méthode, URL, options) POUR UN MÉDECIN TIRÉ AU SORT
+# -------------------------------------------------------------------
+def build_request(name, doctor, rng):
+    today = date.today()
+    if name == "login":
+        return "POST", "/login", {"data": {"email": doctor["email"], "password": PASSWORD}}, False
+    if name == "dashboard":
+        return "GET", "/dashboard", {}, True
+    if name == "events":
+        week = today - timedelta(days=today.weekday()) + timedelta(weeks=rng.randint(-26, 8))
+        return "GET", f"/api/events?start={week}&end={week + timedelta(days=7)}", {}, True
+    if name == "edit_calendar":
+        month = (today.replace(day=1) - timedelta(days=31 * rng.randint(0, 5))).replace(day=1)
+        return "GET", f"/calendar/edit?start={month}&end={month + timedelta(days=31)}", {}, True
+    if name == "stats":
+        return "GET", "/api/stats", {}, True
+    if name == "confirm":
+        return "POST", f"/api/confirm_reservation/{rng.choice(doctor['patients'])}", {}, True
+    if name == "reschedule":
+        day = today + timedelta(days=rng.randint(1, 60))
+        body = {"new_date": day.isoformat(), "new_time": f"{rng.randint(8, 17):02d}:{rng.choice((0, 30)):02d}"}
+        return "POST", f"/api/reschedule_reservation/{rng.choice(doctor['patients'])}", {"json": body}, True
+    if name == "batch":
+        ops = [{"action": "confirm", "patient_id": pid} for pid in rng.sample(doctor["patients"], min(20, len(doctor["patients"])))]
+        return "POST", "/api/reservations/batch", {"json": {"operations": ops}}, True
+    if name == "delete":
+        pid = doctor["patients"].pop(rng.randrange(len(doctor["patients"])))
+        return "DELETE", f"/api/delete_reservation/{pid}", {}, True
+    raise ValueError(name)
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+# -------------------------------------------------------------------
+# EXÉCUTION WSGI (THREADS) OU ASGI (ASYNCIO)
+# -------------------------------------------------------------------
+def run_wsgi(appmod, plan, sessions, concurrency):
+    def one(item):
+        method, url, options, authenticated, doctor = item
+        client = appmod.app.test_client()
+        if authenticated:
+            client.set_cookie("session", sessions[doctor["id"]])
+        t0 = time.perf_counter()
+        response = client.open(url, method=method, **options)
+        return time.perf_counter() - t0, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, plan))
+
+def run_asgi(asgi_app, plan, sessions, concurrency):
+    import httpx
+
+    async def main():
+        limit = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://bench") as client:
+            async def one(item):
+                method, url, options, authenticated, doctor = item
+                headers = {"Cookie": f"session={sessions[doctor['id']]}"} if authenticated else {}
+                async with limit:
+                    t0 = time.perf_counter()
+                    response = await client.request(method, url, headers=headers, **options)
+                    return time.perf_counter() - t0, response.status_code
+            return await asyncio.gather(*(one(item) for item in plan))
+
+    return asyncio.run(main())
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    import app as appmod
+    from fake_supabase import FakeSupabase
+
+    backend = FakeSupabase(latency_ms=args.latency, jitter_ms=args.jitter, seed=args.seed)
+    appmod.use_data_backend(backend)
+    asgi_app = None
+    if args.asgi:
+        import asgi
+        asgi.use_async_data_backend(backend.async_client())
+        asgi_app = asgi.app
+
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    doctors = seed(backend, args, rng)
+    print(f"Jeu de données : {args.doctors} médecins × {args.patients} patients "
+          f"({time.perf_counter() - t0:.1f} s) ; latence {args.latency} ms ± {args.jitter} ms ; "
+          f"concurrence {args.concurrency} ; mode {'ASGI' if args.asgi else 'WSGI'}"
+          f"{' ; caches désactivés' if args.no_cache else ''}")
+
+    # Une session par médecin, ouverte hors mesure
+    sessions = {}
+    for doctor in doctors:
+        client = appmod.app.test_client()
+        client.post("/login", data={"email": doctor["email"], "password": PASSWORD})
+        sessions[doctor["id"]] = client.get_cookie("session").value
+
+    print(f"{'scénario':<14}{'req':>6}{'2xx/3xx':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'db/req':>8}")
+    for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+        plan = []
+        for _ in range(args.requests):
+            doctor = rng.choice(doctors)
+            if name == "delete" and not doctor["patients"]:
+                continue
+            plan.append(build_request(name, doctor, rng) + (doctor,))
+        calls_before = backend.calls
+        started = time.perf_counter()
+        if args.asgi:
+            results = run_asgi(asgi_app, plan, sessions, args.concurrency)
+        else:
+            results = run_wsgi(appmod, plan, sessions, args.concurrency)
+        elapsed = time.perf_counter() - started
+        latencies = sorted(r[0] * 1000 for r in results)
+        ok = sum(1 for r in results if r[1] < 400)
+        print(f"{name:<14}{len(results):>6}{ok / max(len(results), 1):>9.0%}"
+              f"{percentile(latencies, 0.50):>9.1f}{percentile(latencies, 0.95):>9.1f}{percentile(latencies, 0.99):>9.1f}"
+              f"{len(results) / elapsed:>9.1f}{(backend.calls - calls_before) / max(len(results), 1):>8.2f}")
+
+if __name__ == "__main__":
+    main()
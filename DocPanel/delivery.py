@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from flask import request, url_for
+from jinja2 import FileSystemBytecodeCache
+
+try:
+    import brotli
+except ImportError:  # gzip seul si le paquet Brotli n'est pas installé
+    brotli = None
+
+# -------------------------------------------------------------------
+# LIVRAISON DES RÉPONSES : ASSETS VERSIONNÉS, CACHE JINJA, COMPRESSION
+# -------------------------------------------------------------------
+# - asset_url("css/dashboard.css") -> /static/css/dashboard.css?v=<empreinte> ;
+#   une URL versionnée ne change jamais de contenu : cache navigateur d'un an.
+# - Templates compilés une fois puis partagés par tous les workers via
+#   JINJA_CACHE_DIR (bytecode invalidé automatiquement si le source change).
+# - gzip ou brotli selon Accept-Encoding pour HTML, JSON, CSS, JS... ; les
+#   réponses en flux (exports CSV/ICS, SSE) ne sont pas compressées.
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "docpanel-jinja"))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+COMPRESSIBLE_TYPES = (
+    "text/html", "text/css", "text/plain", "text/csv", "text/calendar", "text/javascript",
+    "application/json", "application/javascript", "image/svg+xml"
+)
+
+_fingerprints = {}
+# Fichiers statiques compressés une fois, au niveau maximal : (fichier, etag, encodage) -> octets
+_static_compressed = {}
+_static_lock = threading.Lock()
+# Réponses dynamiques à ETag fort (ex. /api/events en cache) : (etag, encodage) -> octets
+ETAG_CACHE_SIZE = int(os.getenv("COMPRESS_ETAG_CACHE_SIZE", "256"))
+_etag_compressed = OrderedDict()
+_etag_lock = threading.Lock()
+
+def asset_url(filename):
+    """URL /static/ suffixée par l'empreinte SHA-256 du contenu (calculée une fois par processus)."""
+    fingerprint = _fingerprints.get(filename)
+    if fingerprint is None:
+        from flask import current_app
+        with open(os.path.join(current_app.static_folder, filename), "rb") as f:
+            fingerprint = hashlib.sha256(f.read()).hexdigest()[:12]
+        _fingerprints[filename] = fingerprint
+    return url_for("static", filename=filename, v=fingerprint)
+
+def compress(data, encoding, static=False):
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if static else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if static else GZIP_LEVEL)
+
+def negotiate_encoding():
+    offers = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offers)
+
+def compress_response(response):
+    response.vary.add("Accept-Encoding")
+    if "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    static = request.endpoint == "static"
+    if response.is_streamed and not static:
+        return response
+    encoding = negotiate_encoding()
+    if not encoding:
+        return response
+
+    # La représentation dépend de l'encodage : l'ETag devient faible, sur le 200
+    # comme sur le 304 qui le revalide (même validateur), compressé ou non
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    if response.status_code != 200:
+        return response
+
+    if static:
+        key = (request.path, etag, encoding)
+        source = response.response
+        body = _static_compressed.get(key)
+        if body is None:
+            response.direct_passthrough = False
+            data = response.get_data()
+            if len(data) < COMPRESS_MIN_SIZE:
+                return response
+            body = compress(data, encoding, static=True)
+            with _static_lock:
+                _static_compressed[key] = body
+        # Fichier ouvert par send_file : remplacé par la version compressée
+        if hasattr(source, "close"):
+            source.close()
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        key = (etag, encoding) if etag and not weak else None
+        with _etag_lock:
+            body = _etag_compressed.get(key) if key else None
+            if body is not None:
+                _etag_compressed.move_to_end(key)
+        if body is None:
+            body = compress(data, encoding)
+            if key:
+                with _etag_lock:
+                    _etag_compressed[key] = body
+                    while len(_etag_compressed) > ETAG_CACHE_SIZE:
+                        _etag_compressed.popitem(last=False)
+
+    response.direct_passthrough = False
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+def init_delivery(app):
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+    app.jinja_env.globals["asset_url"] = asset_url
+
+    @app.after_request
+    def deliver(response):
+        if request.endpoint == "static" and request.args.get("v"):
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return compress_response(response)
@@ -0,0 +1,79 @@
+import csv
+import io
+from datetime import datetime, timezone
+
+# -------------------------------------------------------------------
+# EXPORTS CSV / ICS (GÉNÉRATEURS : UNE LIGNE PRODUITE PAR RÉSERVATION)
+# -------------------------------------------------------------------
+CSV_HEADER = ["id", "patient", "telephone", "email", "date", "heure", "statut", "debut", "fin"]
+
+ICS_STATUS = {
+    "confirmed": "CONFIRMED",
+    "cancelled": "CANCELLED",
+}
+
+# Cellules interprétées comme formules par Excel/LibreOffice (injection CSV)
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_text(value):
+    """Champ saisi côté patient : neutralisé par une apostrophe s'il commence comme une formule."""
+    return "'" + value if value and value.startswith(CSV_FORMULA_PREFIXES) else value
+
+def csv_lines(reservations):
+    """En-tête puis une ligne CSV par réservation ; BOM UTF-8 pour les noms arabes sous Excel."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(CSV_HEADER)
+    yield "\ufeff" + flush()
+    for r in reservations:
+        writer.writerow([
+            r["patient_id"], _csv_text(r["patient_name"]), _csv_text(r["patient_phone"]), _csv_text(r["patient_email"]),
+            r["date"], r["time"], r["status"], r["start"], r["end"]
+        ])
+        yield flush()
+
+def _ics_escape(value):
+    """Échappement TEXT (RFC 5545 §3.3.11) ; un CR seul compte comme un saut de ligne, jamais brut."""
+    value = str(value).replace("\r\n", "\n").replace("\r", "\n")
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _ics_datetime(value):
+    return datetime.fromisoformat(value).strftime("%Y%m%dT%H%M%S")
+
+def _ics_fold(line):
+    """Replie les lignes à 75 octets (RFC 5545 §3.1) sans couper un caractère UTF-8."""
+    out, current = [], ""
+    for char in line:
+        if len((current + char).encode()) > 75:
+            out.append(current)
+            current = " " + char
+        else:
+            current += char
+    out.append(current)
+    return "\r\n".join(out) + "\r\n"
+
+def ics_lines(reservations, domain="docpanel"):
+    """Calendrier iCalendar (heures flottantes, heure locale du cabinet)."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//DocPanel//Rendez-vous//FR\r\nCALSCALE:GREGORIAN\r\n"
+    for r in reservations:
+        description = f"Tél : {r['patient_phone'] or 'Non fourni'}\nEmail : {r['patient_email'] or 'Non fourni'}"
+        yield "".join(_ics_fold(line) for line in (
+            "BEGIN:VEVENT",
+            f"UID:patient-{r['patient_id']}@{domain}",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ics_datetime(r['start'])}",
+            f"DTEND:{_ics_datetime(r['end'])}",
+            f"SUMMARY:{_ics_escape(r['patient_name'] or 'Patient')}",
+            f"DESCRIPTION:{_ics_escape(description)}",
+            f"STATUS:{ICS_STATUS.get(r['status'], 'TENTATIVE')}",
+            "END:VEVENT"
+        ))
+    yield "END:VCALENDAR\r\n"
@@ -0,0 +1,28 @@
+# -------------------------------------------------------------------
+# CONFIGURATION GUNICORN (CHARGÉE AUTOMATIQUEMENT DEPUIS LE RÉPERTOIRE COURANT)
+# -------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+
+# Workers à threads (gthread) : chaque worker sert plusieurs requêtes à la fois,
+# ce qui permet au pool bcrypt borné de saturer et de répondre 429 au lieu
+# de bloquer tout le worker. Il faut plus de threads que de places dans ce pool
+# (PASSWORD_WORKERS + PASSWORD_QUEUE_SIZE, 6 par défaut).
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Métriques Prometheus partagées entre workers : doit être défini avant que
+# les workers importent prometheus_client (donc ici, dans le processus maître)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "docpanel-metrics"))
+
+def on_starting(server):
+    # Repartir de zéro à chaque démarrage (fichiers des anciens workers)
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
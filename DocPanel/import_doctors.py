@@ -0,0 +1,194 @@
+# -------------------------------------------------------------------
+# IMPORT EN MASSE DE MÉDECINS (CSV OU JSONL)
+# -------------------------------------------------------------------
+# Usage :
+#   python import_doctors.py medecins.csv --report erreurs.csv
+#   python import_doctors.py medecins.jsonl --batch-size 500 --workers 8
+#   python import_doctors.py medecins.csv --dry-run      # validation seule
+#
+# Une ligne = un médecin, avec les colonnes du formulaire de profil :
+#   email, password, nom_fr, nom_ar, prenom_fr, prenom_ar, specialite_fr, ...,
+#   activite_fr, activite_ar, tel  (+ language facultatif : fr / ar / both)
+# L'email sert d'identifiant de connexion et d'email du profil.
+#
+# Le fichier est lu en flux, par lots : validation (profiles.py), contrôle des
+# emails déjà inscrits (une requête par tranche de 100 emails), hachage bcrypt
+# dans un pool de processus, puis une seule insertion par lot. Les lignes
+# rejetées sont rapportées avec leur numéro et la liste de leurs erreurs.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from profiles import build_profile_data, is_valid_email, validate_profile
+
+LANGUAGES = ("fr", "ar", "both")
+# Emails par requête de contrôle (~3 Ko d'URL)
+EMAIL_CHECK_CHUNK = 100
+
+def read_rows(path, fmt=None):
+    """(numéro de ligne, dict) pour chaque ligne du fichier, sans tout charger en mémoire."""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, row
+            return
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else {"__invalid__": True}
+
+def validate_row(row, seen_emails):
+    if row.get("__invalid__"):
+        return ["Ligne JSON invalide"]
+    email = str(row.get("email") or "").strip().lower()
+    pwd = str(row.get("password") or "")
+    errors = []
+    if not email or not is_valid_email(email):
+        errors.append("Email invalide.")
+    elif email in seen_emails:
+        errors.append("Email en double dans le fichier.")
+    if len(pwd) < 6:
+        errors.append("Le mot de passe doit faire au moins 6 caractères.")
+    if (row.get("language") or "both") not in LANGUAGES:
+        errors.append("Langue invalide (fr, ar ou both).")
+    errors += validate_profile(dict(row, email=email))
+    return errors
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class DoctorImporter:
+    def __init__(self, db, hash_fn, pool, dry_run=False):
+        self.db = db
+        self.hash_fn = hash_fn
+        self.pool = pool
+        self.dry_run = dry_run
+        self.seen_emails = set()
+        self.imported = 0
+        self.errors = []
+
+    def reject(self, line_no, email, errors):
+        self.errors.append({"line": line_no, "email": email, "errors": errors})
+
+    def existing_emails(self, emails):
+        """Emails déjà inscrits, par tranches : un lot entier dans in.(...) dépasse la limite d'URL des proxys."""
+        taken = set()
+        emails = sorted(emails)
+        for i in range(0, len(emails), EMAIL_CHECK_CHUNK):
+            res = self.db.table("users").select("email").in_("email", emails[i:i + EMAIL_CHECK_CHUNK]).execute()
+            taken.update(row["email"] for row in res.data or [])
+        return taken
+
+    def insert(self, users):
+        """Une insertion par lot ; en cas d'échec, ligne par ligne pour isoler les fautives."""
+        try:
+            self.db.table("users").insert([user for _, user in users]).execute()
+            self.imported += len(users)
+            return
+        except Exception as e:
+            print(f"❌ ERREUR insertion d'un lot de {len(users)} médecins, reprise ligne par ligne : {e}")
+        for line_no, user in users:
+            try:
+                self.db.table("users").insert(user).execute()
+                self.imported += 1
+            except Exception as e:
+                self.reject(line_no, user["email"], [f"Insertion refusée : {e}"])
+
+    def process(self, batch):
+        candidates = []
+        for line_no, row in batch:
+            errors = validate_row(row, self.seen_emails)
+            email = str(row.get("email") or "").strip().lower()
+            if errors:
+                self.reject(line_no, email, errors)
+                continue
+            self.seen_emails.add(email)
+            candidates.append((line_no, email, row))
+
+        taken = self.existing_emails({email for _, email, _ in candidates})
+        accepted = []
+        for line_no, email, row in candidates:
+            if email in taken:
+                self.reject(line_no, email, ["Email déjà utilisé."])
+            else:
+                accepted.append((line_no, email, row))
+        if self.dry_run:
+            self.imported += len(accepted)
+            return
+        if not accepted:
+            return
+
+        hashes = self.pool.map(self.hash_fn, [str(row["password"]) for _, _, row in accepted], chunksize=4)
+        now = datetime.now(timezone.utc).isoformat()
+        users = [
+            (line_no, {
+                "email": email,
+                "password_hash": pwd_hash,
+                "language": row.get("language") or "both",
+                "created_at": now,
+                "updated_at": now,
+                "profile_data": build_profile_data(dict(row, email=email)),
+                "calendar": {}
+            })
+            for (line_no, email, row), pwd_hash in zip(accepted, hashes)
+        ]
+        self.insert(users)
+
+def write_report(path, errors):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ligne", "email", "erreurs"])
+        for error in errors:
+            writer.writerow([error["line"], error["email"], " | ".join(error["errors"])])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import en masse de médecins (CSV ou JSONL)")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("IMPORT_BATCH_SIZE", "500")))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="processus de hachage bcrypt")
+    parser.add_argument("--report", help="fichier CSV des lignes rejetées (sinon affichées)")
+    parser.add_argument("--dry-run", action="store_true", help="valider sans rien écrire")
+    args = parser.parse_args(argv)
+
+    # Import tardif : variables d'environnement (.env) et client de données de l'application
+    import app
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        importer = DoctorImporter(app.get_db(), app._hash_password, pool, dry_run=args.dry_run)
+        for batch in batches(read_rows(args.path, args.format), args.batch_size):
+            importer.process(batch)
+            print(f"… {importer.imported} importés, {len(importer.errors)} rejetés")
+
+    importer.errors.sort(key=lambda error: error["line"])
+    verb = "validés" if args.dry_run else "importés"
+    print(f"✅ {importer.imported} médecins {verb}, ❌ {len(importer.errors)} lignes rejetées "
+          f"en {time.perf_counter() - started:.1f} s")
+    if args.report:
+        write_report(args.report, importer.errors)
+        print(f"Rapport d'erreurs : {args.report}")
+    else:
+        for error in importer.errors:
+            print(f"  ligne {error['line']} ({error['email'] or '?'}) : {' | '.join(error['errors'])}")
+    return 1 if importer.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import hmac
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context, request, before_render_template, template_rendered
+from prometheus_client import CollectorRegistry, CONTENT_TYPE_LATEST, Histogram, REGISTRY, generate_latest, multiprocess
+
+# -------------------------------------------------------------------
+# INSTRUMENTATION PAR REQUÊTE : SERVER-TIMING, APPELS BASE, /metrics
+# -------------------------------------------------------------------
+# Sous gunicorn, gunicorn.conf.py définit PROMETHEUS_MULTIPROC_DIR avant le
+# chargement des workers : chaque worker écrit ses histogrammes dans ce
+# répertoire et /metrics agrège l'ensemble, quel que soit le worker interrogé.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))  # 0 = journal désactivé
+# Jeton exigé par /metrics (en-tête Authorization: Bearer <jeton>) ; sans jeton
+# configuré, /metrics refuse tout : les noms de routes et volumes restent privés.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+REQUEST_SECONDS = Histogram(
+    "docpanel_request_duration_seconds", "Durée des requêtes HTTP",
+    ["endpoint", "method", "status"]
+)
+DB_SECONDS = Histogram(
+    "docpanel_db_query_duration_seconds", "Durée des appels Supabase",
+    ["table", "operation"],
+    buckets=(.002, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5)
+)
+DB_CALLS = Histogram(
+    "docpanel_db_queries_per_request", "Nombre d'appels Supabase par requête",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34)
+)
+PHASE_SECONDS = Histogram(
+    "docpanel_phase_duration_seconds", "Durée des phases coûteuses (bcrypt, rendu des templates)",
+    ["phase"]
+)
+
+
+class RequestTrace:
+    """Mesures accumulées pendant une requête (stockées dans flask.g)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.queries = []
+
+    def add(self, phase, seconds):
+        total, count = self.phases.get(phase, (0.0, 0))
+        self.phases[phase] = (total + seconds, count + 1)
+
+
+def current_trace():
+    return g.get("_trace") if has_app_context() else None
+
+def record_phase(phase, seconds):
+    PHASE_SECONDS.labels(phase).observe(seconds)
+    trace = current_trace()
+    if trace is not None:
+        trace.add(phase, seconds)
+
+@contextmanager
+def timed(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start)
+
+# -------------------------------------------------------------------
+# CLIENT DE DONNÉES INSTRUMENTÉ (SYNCHRONE OU ASYNCHRONE)
+# -------------------------------------------------------------------
+# Les filtres sont journalisés par nom de colonne uniquement (pas de valeurs :
+# emails et téléphones ne doivent pas finir dans les logs).
+def _describe(name, args):
+    if args and isinstance(args[0], str) and name not in ("select", "insert", "update", "upsert"):
+        return f"{name}({args[0]})"
+    return name
+
+def record_query(table, steps, seconds):
+    operation = steps[0] if steps else "?"
+    DB_SECONDS.labels(table, operation).observe(seconds)
+    trace = current_trace()
+    if trace is not None:
+        trace.add("db", seconds)
+        trace.queries.append((".".join((table,) + steps), seconds))
+
+
+class InstrumentedQuery:
+    def __init__(self, query, table, steps=()):
+        self._query = query
+        self._table = table
+        self._steps = steps
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def step(*args, **kwargs):
+            return InstrumentedQuery(attr(*args, **kwargs), self._table, self._steps + (_describe(name, args),))
+        return step
+
+    def execute(self):
+        start = time.perf_counter()
+        try:
+            result = self._query.execute()
+        except Exception:
+            record_query(self._table, self._steps, time.perf_counter() - start)
+            raise
+        if inspect.isawaitable(result):
+            return self._await(result, start)
+        record_query(self._table, self._steps, time.perf_counter() - start)
+        return result
+
+    async def _await(self, result, start):
+        try:
+            return await result
+        finally:
+            record_query(self._table, self._steps, time.perf_counter() - start)
+
+
+class InstrumentedClient:
+    """Enveloppe table()/from_() ; tout le reste est délégué au client d'origine."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return InstrumentedQuery(self._client.table(name), name)
+
+    from_ = table
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def instrument_client(client):
+    return client if isinstance(client, InstrumentedClient) else InstrumentedClient(client)
+
+# -------------------------------------------------------------------
+# HOOKS FLASK
+# -------------------------------------------------------------------
+def _endpoint():
+    return request.url_rule.rule if request.url_rule else "<non trouvé>"
+
+def server_timing(trace, total):
+    parts = []
+    for phase, (seconds, count) in trace.phases.items():
+        parts.append(f'{phase};dur={seconds * 1000:.1f};desc="{count}x"')
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+def log_slow_request(trace, total, status):
+    lines = [f"🐢 Requête lente : {request.method} {request.path} -> {status} en {total * 1000:.0f} ms"]
+    for phase, (seconds, count) in trace.phases.items():
+        lines.append(f"   {phase} : {seconds * 1000:.1f} ms ({count}x)")
+    for i, (query, seconds) in enumerate(trace.queries, 1):
+        lines.append(f"   #{i} {query} : {seconds * 1000:.1f} ms")
+    print("\n".join(lines))
+
+def init_instrumentation(app):
+    @app.before_request
+    def start_trace():
+        g._trace = RequestTrace()
+
+    @app.after_request
+    def finish_trace(response):
+        trace = g.pop("_trace", None)
+        if trace is None:
+            return response
+        # Réponses en flux (exports, SSE) : mesure jusqu'à l'envoi des en-têtes
+        total = time.perf_counter() - trace.started
+        endpoint = _endpoint()
+        REQUEST_SECONDS.labels(endpoint, request.method, str(response.status_code)).observe(total)
+        DB_CALLS.labels(endpoint).observe(len(trace.queries))
+        response.headers["Server-Timing"] = server_timing(trace, total)
+        if SLOW_REQUEST_MS and total * 1000 >= SLOW_REQUEST_MS:
+            log_slow_request(trace, total, response.status_code)
+        return response
+
+    def template_started(sender, template, context, **extra):
+        if has_app_context():
+            g._template_started = time.perf_counter()
+
+    def template_finished(sender, template, context, **extra):
+        if has_app_context() and "_template_started" in g:
+            record_phase("template", time.perf_counter() - g.pop("_template_started"))
+
+    # weak=False : les fonctions locales seraient sinon libérées aussitôt
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+def metrics_authorized(headers):
+    if not METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}")
+
+def metrics_payload():
+    """Texte d'exposition Prometheus, agrégé sur tous les workers en mode multiprocessus."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,51 @@
+-- -------------------------------------------------------------------
+-- SYNCHRONISATION INCRÉMENTALE : CURSEUR updated_at + PIERRES TOMBALES
+-- -------------------------------------------------------------------
+-- À exécuter une fois (éditeur SQL Supabase ou psql) avant de déployer
+-- /api/events?since=... et /api/events/stream. Idempotent.
+--
+-- Les réservations sont aussi écrites par l'application côté patients, qui ne
+-- renseigne pas forcément updated_at : la base le tient à jour elle-même, sans
+-- quoi ces lignes n'apparaissent jamais dans le flux. De même, les suppressions
+-- sont tracées par un déclencheur, quel que soit le client qui supprime.
+
+-- La colonne existe déjà (écrite par l'application) : garantir défaut et NOT NULL
+alter table patients add column if not exists updated_at timestamptz;
+alter table patients alter column updated_at set default now();
+update patients set updated_at = now() where updated_at is null;
+alter table patients alter column updated_at set not null;
+create index if not exists patients_doctor_updated_at_idx on patients (doctor_id, updated_at);
+
+create or replace function patients_touch_updated_at() returns trigger
+language plpgsql as $$
+begin
+    new.updated_at := now();
+    return new;
+end $$;
+
+drop trigger if exists patients_touch_updated_at on patients;
+create trigger patients_touch_updated_at
+    before insert or update on patients
+    for each row execute function patients_touch_updated_at();
+
+-- Les suppressions laissent une trace pour que les clients puissent les appliquer
+create table if not exists reservation_tombstones (
+    patient_id text not null,
+    doctor_id text not null,
+    deleted_at timestamptz not null default now()
+);
+create index if not exists reservation_tombstones_doctor_deleted_at_idx
+    on reservation_tombstones (doctor_id, deleted_at);
+
+create or replace function patients_record_tombstone() returns trigger
+language plpgsql as $$
+begin
+    insert into reservation_tombstones (patient_id, doctor_id)
+    values (old.id::text, old.doctor_id::text);
+    return old;
+end $$;
+
+drop trigger if exists patients_record_tombstone on patients;
+create trigger patients_record_tombstone
+    after delete on patients
+    for each row execute function patients_record_tombstone();
@@ -0,0 +1,49 @@
+-- -------------------------------------------------------------------
+-- RÉSERVATIONS : PAS DE CHEVAUCHEMENT CÔTÉ BASE
+-- -------------------------------------------------------------------
+-- À exécuter une fois (éditeur SQL Supabase ou psql). Idempotent.
+--
+-- Le contrôle des conflits de plan_reservation_operations lit les
+-- réservations puis écrit en deux allers-retours : deux reports simultanés
+-- vers le même créneau passent tous les deux ce contrôle. Seule cette
+-- contrainte les départage ; sa violation (SQLSTATE 23P01) est renvoyée
+-- en 409 « Créneau déjà réservé » par reservation_operations_flow.
+--
+-- La durée doit correspondre à RESERVATION_MINUTES (30 par défaut).
+-- Les réservations annulées libèrent leur créneau, comme blocks_slot() ; un
+-- statut NULL vaut « reserved » (project_reservation) et bloque le créneau.
+
+create extension if not exists btree_gist;
+
+-- Avant d'ajouter la contrainte, les chevauchements existants doivent être
+-- résolus à la main ; cette requête les liste :
+--
+--   select a.id, b.id, a.doctor_id, a.patient_date_reservation, a.patient_time_reservation
+--   from patients a join patients b
+--     on a.doctor_id = b.doctor_id and a.id < b.id
+--    and coalesce(a.status, 'reserved') <> 'cancelled' and coalesce(b.status, 'reserved') <> 'cancelled'
+--    and tsrange(a.patient_date_reservation + a.patient_time_reservation,
+--                a.patient_date_reservation + a.patient_time_reservation + interval '30 minutes')
+--     && tsrange(b.patient_date_reservation + b.patient_time_reservation,
+--                b.patient_date_reservation + b.patient_time_reservation + interval '30 minutes');
+
+do $$
+begin
+    -- Première version de la contrainte : un statut NULL n'y bloquait pas le créneau
+    if exists (
+        select 1 from pg_constraint
+        where conname = 'patients_no_overlap'
+          and pg_get_constraintdef(oid) not ilike '%coalesce%'
+    ) then
+        alter table patients drop constraint patients_no_overlap;
+    end if;
+    if not exists (select 1 from pg_constraint where conname = 'patients_no_overlap') then
+        alter table patients add constraint patients_no_overlap exclude using gist (
+            doctor_id with =,
+            tsrange(
+                patient_date_reservation + patient_time_reservation,
+                patient_date_reservation + patient_time_reservation + interval '30 minutes'
+            ) with &&
+        ) where (coalesce(status, 'reserved') <> 'cancelled');
+    end if;
+end $$;
@@ -0,0 +1,85 @@
+import re
+
+# -------------------------------------------------------------------
+# VALIDATION DES PROFILS BILINGUES (COMPILÉE UNE FOIS À L'IMPORT)
+# -------------------------------------------------------------------
+# Partagée par edit_profile (formulaire) et import_doctors.py (import en masse) :
+# expressions régulières, listes de champs et messages d'erreur sont construits
+# ici une seule fois au lieu de l'être à chaque appel.
+EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+ARABIC_RE = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+FRENCH_RE = re.compile(r'[a-zA-ZàâäéèêëïîôöùûüÿçÀÂÄÉÈÊËÏÎÔÖÙÛÜŸÇ]')
+
+# (champ, libellé français, libellé arabe)
+BILINGUAL_FIELDS = (
+    ("nom", "Nom", "الاسم"),
+    ("prenom", "Prénom", "الاسم الأول"),
+    ("specialite", "Spécialité", "التخصص"),
+    ("ville", "Ville", "المدينة"),
+    ("quartier", "Quartier", "الحي"),
+    ("adresse", "Adresse", "العنوان"),
+    ("type_diplome", "Type de diplôme", "نوع الشهادة"),
+    ("secteur", "Secteur", "القطاع"),
+    ("activite", "Activité", "النشاط"),
+)
+STANDARD_FIELDS = (("tel", "Téléphone"), ("email", "Email"))
+
+# Champs du formulaire de profil, dans l'ordre d'affichage
+PROFILE_FORM_FIELDS = tuple(
+    f"{name}_{lang}" for name, _, _ in BILINGUAL_FIELDS for lang in ("fr", "ar")
+) + tuple(field for field, _ in STANDARD_FIELDS)
+
+_REQUIRED_CHECKS = tuple(
+    check
+    for name, label_fr, label_ar in BILINGUAL_FIELDS
+    for check in ((f"{name}_fr", f"{label_fr} (Français) est obligatoire"),
+                  (f"{name}_ar", f"{label_ar} (عربي) est obligatoire"))
+) + tuple((field, f"{label} est obligatoire") for field, label in STANDARD_FIELDS)
+
+_FRENCH_CHECKS = tuple(
+    (f"{name}_fr", f"Le champ {name} (Français) doit contenir du texte en français")
+    for name, _, _ in BILINGUAL_FIELDS
+)
+_ARABIC_CHECKS = tuple(
+    (f"{name}_ar", f"Le champ {name} (العربية) doit contenir du texte en arabe")
+    for name, _, _ in BILINGUAL_FIELDS
+)
+
+def is_valid_email(email):
+    return EMAIL_RE.match(email)
+
+def has_arabic_characters(text):
+    return ARABIC_RE.search(text) is not None
+
+def has_french_characters(text):
+    return FRENCH_RE.search(text) is not None
+
+def _value(data, field):
+    return str(data.get(field) or "").strip()
+
+def validate_bilingual_data(data):
+    return [message for field, message in _REQUIRED_CHECKS if not _value(data, field)]
+
+def validate_language_content(data):
+    errors = []
+    for field, message in _FRENCH_CHECKS:
+        value = _value(data, field)
+        if value and FRENCH_RE.search(value) is None:
+            errors.append(message)
+    for field, message in _ARABIC_CHECKS:
+        value = _value(data, field)
+        if value and ARABIC_RE.search(value) is None:
+            errors.append(message)
+    return errors
+
+def validate_profile(data):
+    """Champs obligatoires puis contenu par langue ; liste vide si le profil est valide."""
+    return validate_bilingual_data(data) + validate_language_content(data)
+
+def build_profile_data(data):
+    """Champs plats du formulaire -> profile_data ({"nom": {"fr": ..., "ar": ...}, ..., "tel", "email"})."""
+    profile = {name: {"fr": _value(data, f"{name}_fr"), "ar": _value(data, f"{name}_ar")}
+               for name, _, _ in BILINGUAL_FIELDS}
+    for field, _ in STANDARD_FIELDS:
+        profile[field] = _value(data, field)
+    return profile
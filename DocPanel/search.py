@@ -0,0 +1,135 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+# -------------------------------------------------------------------
+# RECHERCHE DE MÉDECINS : INDEX INVERSÉ BILINGUE EN MÉMOIRE
+# -------------------------------------------------------------------
+# Normalisation commune au français et à l'arabe :
+#   - minuscules + décomposition NFKD puis suppression des marques combinantes :
+#     accents français (é -> e), harakat / tanwin / shadda, hamza portée
+#     (أ إ آ -> ا, ؤ -> و, ئ -> ي), formes de présentation arabes ;
+#   - ٱ -> ا, ى -> ي, ة -> ه, suppression du tatweel, œ -> oe, æ -> ae ;
+#   - l'article « ال » est retiré en tête de mot (القلب -> قلب).
+SEARCH_FIELDS = ("specialite", "ville", "quartier", "activite")
+
+FIELD_GROUPS = {
+    "specialite": ("specialite",),
+    "ville": ("ville", "quartier"),
+}
+
+# Champs renvoyés au patient (ni email ni données de compte)
+PUBLIC_FIELDS = ("nom", "prenom", "specialite", "ville", "quartier", "adresse", "activite", "tel")
+
+TOKEN_RE = re.compile(r"\w+")
+FOLD = str.maketrans({"ٱ": "ا", "ى": "ي", "ة": "ه", "ـ": None, "œ": "oe", "æ": "ae"})
+MIN_TOKEN_LENGTH = 2
+
+def normalize_text(text):
+    decomposed = unicodedata.normalize("NFKD", str(text or "").casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).translate(FOLD)
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall(normalize_text(text)):
+        if token.startswith("ال") and len(token) > 3:
+            token = token[2:]
+        if len(token) >= MIN_TOKEN_LENGTH:
+            tokens.append(token)
+    return tokens
+
+def _field_text(value):
+    if isinstance(value, dict):
+        return " ".join(str(v) for v in value.values() if v)
+    return str(value or "")
+
+
+class DoctorSearchIndex:
+    """Index inversé champ -> jeton -> médecins, avec vocabulaire trié pour les préfixes.
+
+    Une requête coûte une dichotomie par jeton et par champ, puis une
+    intersection d'ensembles : aucun parcours de la table users.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {field: {} for field in SEARCH_FIELDS}
+        self._vocabulary = {field: [] for field in SEARCH_FIELDS}
+        self._tokens = {}
+        self._doctors = {}
+
+    def __len__(self):
+        return len(self._doctors)
+
+    def _remove(self, doctor_id):
+        for field, tokens in self._tokens.pop(doctor_id, {}).items():
+            postings = self._postings[field]
+            for token in tokens:
+                ids = postings.get(token)
+                if ids is None:
+                    continue
+                ids.discard(doctor_id)
+                if not ids:
+                    del postings[token]
+                    vocabulary = self._vocabulary[field]
+                    del vocabulary[bisect_left(vocabulary, token)]
+        self._doctors.pop(doctor_id, None)
+
+    def update(self, doctor_id, profile_data):
+        """(Ré)indexe un médecin ; un profil vide le retire de l'index."""
+        doctor_id = str(doctor_id)
+        with self._lock:
+            self._remove(doctor_id)
+            profile = profile_data or {}
+            tokens = {field: set(tokenize(_field_text(profile.get(field)))) for field in SEARCH_FIELDS}
+            if not any(tokens.values()):
+                return
+            for field, field_tokens in tokens.items():
+                postings = self._postings[field]
+                for token in field_tokens:
+                    if token not in postings:
+                        postings[token] = set()
+                        insort(self._vocabulary[field], token)
+                    postings[token].add(doctor_id)
+            self._tokens[doctor_id] = tokens
+            self._doctors[doctor_id] = {"id": doctor_id, **{f: profile.get(f) for f in PUBLIC_FIELDS if f in profile}}
+
+    def remove(self, doctor_id):
+        with self._lock:
+            self._remove(str(doctor_id))
+
+    def _match(self, token, fields):
+        """Médecins dont un jeton des champs donnés commence par `token` -> score (2 si exact, 1 si préfixe)."""
+        scores = {}
+        for field in fields:
+            postings, vocabulary = self._postings[field], self._vocabulary[field]
+            i = bisect_left(vocabulary, token)
+            while i < len(vocabulary) and vocabulary[i].startswith(token):
+                weight = 2 if vocabulary[i] == token else 1
+                for doctor_id in postings[vocabulary[i]]:
+                    if weight > scores.get(doctor_id, 0):
+                        scores[doctor_id] = weight
+                i += 1
+        return scores
+
+    def search(self, query="", specialite="", ville="", limit=20):
+        criteria = [(token, SEARCH_FIELDS) for token in tokenize(query)]
+        criteria += [(token, FIELD_GROUPS["specialite"]) for token in tokenize(specialite)]
+        criteria += [(token, FIELD_GROUPS["ville"]) for token in tokenize(ville)]
+        if not criteria:
+            return []
+        with self._lock:
+            totals = None
+            # Critères les plus sélectifs d'abord : l'intersection se réduit vite
+            for token, fields in sorted(criteria, key=lambda c: -len(c[0])):
+                scores = self._match(token, fields)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {d: totals[d] + s for d, s in scores.items() if d in totals}
+                if not totals:
+                    return []
+            ranked = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+            return [self._doctors[doctor_id] for doctor_id, _ in ranked]
@@ -0,0 +1,189 @@
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+
+# -------------------------------------------------------------------
+# SESSIONS CÔTÉ SERVEUR : LE COOKIE NE PORTE QU'UN IDENTIFIANT OPAQUE
+# -------------------------------------------------------------------
+# Durée de vie d'une session non permanente, glissante : chaque requête qui
+# arrive après la moitié de cette durée repousse l'expiration côté serveur.
+# Une session n'expire donc qu'après SESSION_LIFETIME_SECONDS d'inactivité.
+# (Les sessions permanentes suivent PERMANENT_SESSION_LIFETIME de Flask.)
+SESSION_LIFETIME_SECONDS = int(os.getenv("SESSION_LIFETIME_SECONDS", "86400"))
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False, expires=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires = expires
+        self.modified = False
+        self.previous_sid = None
+
+    def regenerate(self):
+        """Nouvel identifiant (connexion, déconnexion) : l'ancien est supprimé du stockage à l'enregistrement."""
+        if not self.new and self.previous_sid is None:
+            self.previous_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.new = True
+        self.modified = True
+
+
+class MemorySessionStore:
+    """Stockage en mémoire (un seul processus), LRU borné avec expiration."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            item = self._data.get(sid)
+            if item is None:
+                return None
+            expires, payload = item
+            if expires < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return payload, expires
+
+    def save(self, sid, payload, expires):
+        with self._lock:
+            self._data[sid] = (expires, payload)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """Stockage SQLite partagé par tous les workers gunicorn d'une même machine."""
+
+    PURGE_INTERVAL = 300
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(sid TEXT PRIMARY KEY, payload TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, sid):
+        row = self._connect().execute(
+            "SELECT payload, expires FROM sessions WHERE sid = ? AND expires >= ?", (sid, time.time())
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def save(self, sid, payload, expires):
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (sid, payload, expires) VALUES (?, ?, ?)",
+            (sid, payload, expires)
+        )
+        now = time.time()
+        if now - self._last_purge > self.PURGE_INTERVAL:
+            self._last_purge = now
+            conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+
+    def delete(self, sid):
+        self._connect().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    serializer = session_json_serializer
+
+    def __init__(self, store, lifetime=SESSION_LIFETIME_SECONDS):
+        self.store = store
+        self.lifetime = lifetime
+
+    def _lifetime(self, app, session):
+        if session.permanent:
+            return app.permanent_session_lifetime.total_seconds()
+        return self.lifetime
+
+    def _needs_refresh(self, app, session):
+        """Expiration glissante : réécrit une session inchangée passée la moitié de sa durée de vie."""
+        if session.expires is None:
+            return False
+        return session.expires - time.time() < self._lifetime(app, session) / 2
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            item = self.store.load(sid)
+            if item is not None:
+                payload, expires = item
+                try:
+                    return ServerSideSession(self.serializer.loads(payload), sid=sid, expires=expires)
+                except ValueError:
+                    pass
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # Protection contre la fixation de session : l'identifiant remplacé ne vaut plus rien
+        if session.previous_sid:
+            self.store.delete(session.previous_sid)
+            session.previous_sid = None
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified or self._needs_refresh(app, session):
+            payload = self.serializer.dumps(dict(session))
+            self.store.save(session.sid, payload, time.time() + self._lifetime(app, session))
+
+        if session.new or self.should_set_cookie(app, session):
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+        response.vary.add("Cookie")
+
+
+def create_session_store(backend=None):
+    """Construit le stockage choisi par SESSION_BACKEND (sqlite par défaut, ou memory)."""
+    backend = (backend or os.getenv("SESSION_BACKEND", "sqlite")).lower()
+    if backend == "memory":
+        return MemorySessionStore(maxsize=int(os.getenv("SESSION_MEMORY_MAXSIZE", "10000")))
+    if backend == "sqlite":
+        path = os.getenv("SESSION_SQLITE_PATH") or os.path.join(tempfile.gettempdir(), "docpanel_sessions.sqlite3")
+        return SQLiteSessionStore(path)
+    raise ValueError(f"SESSION_BACKEND inconnu : {backend}")
@@ -0,0 +1,195 @@
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+# -------------------------------------------------------------------
+# MOTEUR DE DISPONIBILITÉ : INDEX D'INTERVALLES TRIÉS [start, end)
+# -------------------------------------------------------------------
+def parse_datetime(value):
+    """ISO 8601 -> datetime naïf (heure locale du cabinet, fuseau ignoré)."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    return datetime.fromisoformat(str(value)).replace(tzinfo=None)
+
+
+class IntervalIndex:
+    """Intervalles triés par début, avec le maximum cumulé des fins.
+
+    Un intervalle [s, e) chevauche l'index si, parmi les intervalles qui
+    commencent avant e, la plus grande fin dépasse s : une dichotomie plus
+    une lecture du maximum cumulé, soit O(log n) par requête.
+    """
+
+    def __init__(self, intervals=()):
+        items = sorted(
+            ((start, end, payload) for start, end, payload in intervals if end > start),
+            key=lambda item: item[:2]
+        )
+        self._starts = [item[0] for item in items]
+        self._ends = [item[1] for item in items]
+        self._payloads = [item[2] for item in items]
+        self._max_ends = []
+        for end in self._ends:
+            self._max_ends.append(max(end, self._max_ends[-1]) if self._max_ends else end)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, start, end, payload=None):
+        """Insère un intervalle (O(n) : réservé aux petits ajouts, ex. un lot de reports)."""
+        if end <= start:
+            return
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._payloads.insert(i, payload)
+        previous = self._max_ends[i - 1] if i else None
+        self._max_ends[i:] = []
+        for end in self._ends[i:]:
+            previous = end if previous is None else max(previous, end)
+            self._max_ends.append(previous)
+
+    def overlaps(self, start, end):
+        i = bisect_left(self._starts, end)
+        return i > 0 and self._max_ends[i - 1] > start
+
+    def starting_between(self, start=None, end=None):
+        """Intervalles dont le début est dans [start, end), dans l'ordre."""
+        i = bisect_left(self._starts, start) if start is not None else 0
+        j = bisect_left(self._starts, end) if end is not None else len(self._starts)
+        for k in range(i, j):
+            yield self._starts[k], self._ends[k], self._payloads[k]
+
+
+class AvailabilityIndex:
+    """Créneaux du calendrier et réservations d'un médecin, indexés séparément."""
+
+    def __init__(self, slots=(), reservations=()):
+        self.slots = IntervalIndex(
+            (parse_datetime(s["start"]), parse_datetime(s["end"]), s) for s in slots
+        )
+        self.reservations = IntervalIndex(
+            (parse_datetime(r["start"]), parse_datetime(r["end"]), r) for r in reservations
+        )
+
+    def conflicts(self, start, end):
+        return self.reservations.overlaps(parse_datetime(start), parse_datetime(end))
+
+    def book(self, start, end, payload=None):
+        self.reservations.add(parse_datetime(start), parse_datetime(end), payload)
+
+    def free_slots(self, start=None, end=None):
+        """Créneaux du calendrier commençant dans [start, end) et sans réservation qui les chevauche."""
+        start = parse_datetime(start) if start else None
+        end = parse_datetime(end) if end else None
+        for slot_start, slot_end, slot in self.slots.starting_between(start, end):
+            if not self.reservations.overlaps(slot_start, slot_end):
+                yield slot
+
+# -------------------------------------------------------------------
+# RÈGLES DE RÉCURRENCE (calendar["recurrence"]) DÉVELOPPÉES PAR FENÊTRE
+# -------------------------------------------------------------------
+# calendar = {
+#     "2024-01-01": [{"start": ..., "end": ...}, ...],   # semaine explicite (prioritaire)
+#     "recurrence": {
+#         "rules": [{"weekdays": [0, 1, 2, 3, 4], "start": "09:00", "end": "12:00",
+#                    "slot_minutes": 30, "from": "2024-01-01", "until": null}],
+#         "exceptions": ["2024-05-01"]                     # jours fériés / congés
+#     }
+# }
+RECURRENCE_KEY = "recurrence"
+DEFAULT_HORIZON = timedelta(days=int(os.getenv("RECURRENCE_HORIZON_DAYS", "90")))
+
+def _parse_time(value):
+    return datetime.strptime(value, "%H:%M").time() if len(value) == 5 else datetime.strptime(value, "%H:%M:%S").time()
+
+def _parse_day(value):
+    return date.fromisoformat(value) if value else None
+
+def normalize_recurrence(data):
+    """Valide et normalise les règles envoyées par le client ; ValueError si invalides."""
+    if not isinstance(data, dict):
+        raise ValueError("Format de règles invalide")
+    rules = []
+    for rule in data.get("rules") or []:
+        try:
+            weekdays = sorted({int(d) for d in rule["weekdays"]})
+            start, end = _parse_time(rule["start"]), _parse_time(rule["end"])
+            slot_minutes = int(rule.get("slot_minutes", 30))
+            valid_from, until = _parse_day(rule.get("from")), _parse_day(rule.get("until"))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Règle invalide : weekdays, start et end (HH:MM) sont requis")
+        if not weekdays or any(d < 0 or d > 6 for d in weekdays):
+            raise ValueError("Jours de la semaine invalides (0 = lundi … 6 = dimanche)")
+        if end <= start or slot_minutes <= 0:
+            raise ValueError("Plage horaire ou durée de créneau invalide")
+        rules.append({
+            "weekdays": weekdays,
+            "start": start.strftime("%H:%M"),
+            "end": end.strftime("%H:%M"),
+            "slot_minutes": slot_minutes,
+            "from": valid_from.isoformat() if valid_from else None,
+            "until": until.isoformat() if until else None
+        })
+    try:
+        exceptions = sorted({date.fromisoformat(d).isoformat() for d in data.get("exceptions") or []})
+    except (TypeError, ValueError):
+        raise ValueError("Dates d'exception invalides (AAAA-MM-JJ)")
+    return {"rules": rules, "exceptions": exceptions}
+
+def expand_recurrence(recurrence, start, end, skip_day=None):
+    """Génère les créneaux des règles pour les jours de [start, end), sans rien matérialiser d'autre."""
+    exceptions = set((recurrence or {}).get("exceptions") or [])
+    rules = (recurrence or {}).get("rules") or []
+    day = start
+    while day < end:
+        iso_day = day.isoformat()
+        if iso_day not in exceptions and not (skip_day and skip_day(day)):
+            for rule in rules:
+                if day.weekday() not in rule["weekdays"]:
+                    continue
+                if (rule.get("from") and iso_day < rule["from"]) or (rule.get("until") and iso_day > rule["until"]):
+                    continue
+                step = timedelta(minutes=rule["slot_minutes"])
+                slot_start = datetime.combine(day, _parse_time(rule["start"]))
+                limit = datetime.combine(day, _parse_time(rule["end"]))
+                while slot_start + step <= limit:
+                    yield {"start": slot_start.isoformat(), "end": (slot_start + step).isoformat()}
+                    slot_start += step
+        day += timedelta(days=1)
+
+def _week_key(value):
+    try:
+        return date.fromisoformat(str(value)[:10]).isocalendar()[:2]
+    except ValueError:
+        return None
+
+def iter_calendar_slots(calendar, start=None, end=None):
+    """Créneaux explicites (par semaine) puis créneaux générés par les règles pour [start, end).
+
+    Une semaine présente explicitement remplace les règles pour cette semaine ;
+    sans fenêtre, les règles sont développées d'aujourd'hui à RECURRENCE_HORIZON_DAYS.
+    """
+    start = parse_datetime(start).date() if start else None
+    end = parse_datetime(end).date() if end else None
+    overridden = set()
+    for week, slots in (calendar or {}).items():
+        if not isinstance(slots, list):
+            continue
+        week_key = _week_key(week)
+        if week_key:
+            overridden.add(week_key)
+            week_start = date.fromisoformat(str(week)[:10])
+            if (end and week_start >= end) or (start and week_start + timedelta(days=7) <= start):
+                continue
+        for slot in slots:
+            if isinstance(slot, dict) and "start" in slot and "end" in slot:
+                if not week_key:
+                    overridden.add(_week_key(slot["start"]))
+                yield slot
+
+    recurrence = (calendar or {}).get(RECURRENCE_KEY)
+    if isinstance(recurrence, dict) and recurrence.get("rules"):
+        first = start or date.today()
+        last = end or first + DEFAULT_HORIZON
+        yield from expand_recurrence(recurrence, first, last, lambda day: day.isocalendar()[:2] in overridden)
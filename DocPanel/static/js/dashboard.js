@@ -0,0 +1,271 @@
+let calendar;
+
+document.addEventListener('DOMContentLoaded', async function() {
+    await loadProfile();
+    initializeCalendar();
+    subscribeToChanges();
+    await loadStats();
+});
+
+const isCancelled = data => data.extendedProps.reservation_status === 'cancelled';
+
+// Un rendez-vous supprimé, déplacé ou annulé libère des créneaux que seul le
+// serveur connaît (calendrier + règles) : la fenêtre affichée est alors rechargée
+function freesSlots(patch) {
+    return patch.deleted.some(id => calendar.getEventById(id))
+        || patch.upserts.some(data => {
+            const existing = calendar.getEventById(data.id);
+            return existing && (existing.start.getTime() !== new Date(data.start).getTime()
+                || isCancelled(data) !== isCancelled(existing));
+        });
+}
+
+// Synchronisation incrémentale : correctifs appliqués sur place au lieu de tout recharger
+function applyPatch(patch) {
+    if (patch.reset || freesSlots(patch)) {
+        calendar.refetchEvents();
+    } else {
+        const source = calendar.getEventSources()[0];
+        patch.upserts.forEach(data => {
+            const existing = calendar.getEventById(data.id);
+            if (existing) existing.remove();
+            const start = new Date(data.start);
+            const end = new Date(data.end);
+            if (!isCancelled(data)) {
+                calendar.getEvents().forEach(ev => {
+                    if (ev.extendedProps.type === 'slot' && ev.start < end && ev.end > start) ev.remove();
+                });
+            }
+            calendar.addEvent(data, source);
+        });
+    }
+    if (patch.cursor > syncCursor) syncCursor = patch.cursor;
+    if (patch.reset || patch.upserts.length || patch.deleted.length) loadStats();
+}
+
+async function syncEvents() {
+    try {
+        const res = await fetch(`/api/events?since=${encodeURIComponent(syncCursor)}`);
+        if (res.ok) applyPatch(await res.json());
+        else calendar.refetchEvents();
+    } catch (e) {
+        calendar.refetchEvents();
+    }
+}
+
+// En WSGI le flux se ferme après chaque réponse : EventSource se reconnecte selon
+// `retry`, c'est une interrogation périodique. Elle est suspendue onglet masqué.
+let changeStream = null;
+
+function openChangeStream() {
+    if (changeStream) return;
+    changeStream = new EventSource(`/api/events/stream?since=${encodeURIComponent(syncCursor)}`);
+    changeStream.addEventListener('patch', e => applyPatch(JSON.parse(e.data)));
+}
+
+function closeChangeStream() {
+    if (!changeStream) return;
+    changeStream.close();
+    changeStream = null;
+}
+
+function subscribeToChanges() {
+    if (!window.EventSource) return;
+    document.addEventListener('visibilitychange', () => {
+        if (document.hidden) {
+            closeChangeStream();
+        } else {
+            openChangeStream();
+        }
+    });
+    if (!document.hidden) openChangeStream();
+}
+
+async function loadProfile() {
+    const profile = profileData;
+    const welcomeAr = document.getElementById('welcomeMessageAr');
+    const welcomeFr = document.getElementById('welcomeMessageFr');
+    const specialty = document.getElementById('doctorSpecialty');
+    const location = document.getElementById('doctorLocation');
+
+    if (profile && profile.nom) {
+        const nomAr = profile.nom.ar || profile.nom.fr;
+        const nomFr = profile.nom.fr;
+        const prenomAr = profile.prenom.ar || profile.prenom.fr;
+        const prenomFr = profile.prenom.fr;
+
+        welcomeAr.textContent = `مرحباً د. ${nomAr} ${prenomAr}`;
+        welcomeFr.textContent = `Bienvenue Dr. ${nomFr} ${prenomFr}`;
+
+        if (profile.specialite) {
+            specialty.innerHTML = `<i class="fas fa-stethoscope"></i> ${profile.specialite.fr || ''}${profile.specialite.ar ? ' - ' + profile.specialite.ar : ''}`;
+        }
+        if (profile.ville) {
+            location.innerHTML = `<i class="fas fa-map-marker-alt"></i> ${profile.ville.fr || ''}${profile.ville.ar ? ' - ' + profile.ville.ar : ''}`;
+        }
+    }
+}
+
+async function loadStats() {
+    try {
+        const res = await fetch('/api/stats');
+        if (!res.ok) return;
+        const stats = await res.json();
+        document.getElementById('weeksProgrammed').textContent = stats.weeks_programmed;
+        document.getElementById('totalPatients').textContent = stats.total_patients;
+        document.getElementById('totalAppointments').textContent = stats.appointments;
+        document.getElementById('upcomingWeek').textContent = stats.upcoming_week;
+    } catch (e) {
+        console.error(e);
+    }
+}
+
+function initializeCalendar() {
+    const calendarEl = document.getElementById('fc-container');
+    calendar = new FullCalendar.Calendar(calendarEl, {
+        locale: 'fr',
+        initialView: 'timeGridWeek',
+        slotMinTime: '06:00:00',
+        slotMaxTime: '20:00:00',
+        nowIndicator: true,
+        height: 'auto',
+        expandRows: true,
+        dayMaxEvents: true,
+        headerToolbar: false,
+        events: '/api/events',
+        eventClick: function(info) {
+            const props = info.event.extendedProps;
+            if (props.type === 'reservation') {
+                showActionButtons(props.patient_id);
+            }
+        },
+        eventDidMount: function(info) {
+            info.el.style.borderRadius = '8px';
+            info.el.style.fontSize = '12px';
+            info.el.style.padding = '2px 6px';
+        },
+        datesSet: function() {
+            document.getElementById('cal-title').textContent = calendar.view.title;
+        }
+    });
+
+    calendar.render();
+    setupCalendarNavigation();
+}
+
+function setupCalendarNavigation() {
+    document.getElementById('cal-prev').addEventListener('click', () => calendar.prev());
+    document.getElementById('cal-next').addEventListener('click', () => calendar.next());
+    document.getElementById('cal-today').addEventListener('click', () => calendar.today());
+
+    const views = ['month', 'week', 'day'];
+    views.forEach(v => {
+        document.getElementById(`view-${v}`).addEventListener('click', () => {
+            calendar.changeView(v === 'month' ? 'dayGridMonth' : v === 'week' ? 'timeGridWeek' : 'timeGridDay');
+            views.forEach(x => {
+                const btn = document.getElementById(`view-${x}`);
+                if (x === v) {
+                    btn.classList.add('btn-primary');
+                    btn.classList.remove('btn-outline');
+                } else {
+                    btn.classList.remove('btn-primary');
+                    btn.classList.add('btn-outline');
+                }
+            });
+        });
+    });
+}
+
+function showActionButtons(patientId) {
+    if (!confirm('Voulez-vous confirmer, reporter ou annuler ce rendez-vous ?')) return;
+
+    const action = prompt('Entrez:\nC = Confirmer\nR = Reporter\nA = Annuler');
+    if (!action) return;
+
+    switch (action.toLowerCase()) {
+        case 'c':
+            confirmReservation(patientId);
+            break;
+        case 'r':
+            openRescheduleModal(patientId);
+            break;
+        case 'a':
+            cancelReservation(patientId);
+            break;
+        default:
+            alert('Action non reconnue');
+    }
+}
+
+async function confirmReservation(patientId) {
+    try {
+        const res = await fetch(`/api/confirm_reservation/${patientId}`, { method: 'POST' });
+        if (res.ok) {
+            showFlashMessage('success', 'Rendez-vous confirmé');
+            syncEvents();
+        } else {
+            showFlashMessage('error', 'Erreur confirmation');
+        }
+    } catch (e) {
+        showFlashMessage('error', 'Erreur réseau');
+    }
+}
+
+function openRescheduleModal(patientId) {
+    currentReschedulePatientId = patientId;
+    document.getElementById('rescheduleModal').style.display = 'flex';
+}
+
+async function confirmReschedule() {
+    const newDate = document.getElementById('newDate').value;
+    const newTime = document.getElementById('newTime').value;
+    if (!newDate || !newTime) {
+        showFlashMessage('error', 'Date et heure requises');
+        return;
+    }
+
+    try {
+        const res = await fetch(`/api/reschedule_reservation/${currentReschedulePatientId}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ new_date: newDate, new_time: newTime })
+        });
+        if (res.ok) {
+            closeModal('rescheduleModal');
+            showFlashMessage('success', 'Rendez-vous reporté');
+            syncEvents();
+        } else {
+            const err = await res.json();
+            showFlashMessage('error', err.error || 'Erreur');
+        }
+    } catch (e) {
+        showFlashMessage('error', 'Erreur réseau');
+    }
+}
+
+async function cancelReservation(patientId) {
+    if (!confirm('Annuler ce rendez-vous ?')) return;
+    try {
+        const res = await fetch(`/api/cancel_reservation/${patientId}`, { method: 'POST' });
+        if (res.ok) {
+            showFlashMessage('success', 'Rendez-vous annulé');
+            syncEvents();
+        } else {
+            showFlashMessage('error', 'Erreur annulation');
+        }
+    } catch (e) {
+        showFlashMessage('error', 'Erreur réseau');
+    }
+}
+
+function logout() {
+    window.location.href = '/logout';
+}
+
+function showFlashMessage(type, message) {
+    const flash = document.createElement('div');
+    flash.className = `flash-message ${type}`;
+    flash.innerHTML = `<i class="fas fa-${type === 'error' ? 'exclamation-circle' : type === 'success' ? 'check-circle' : 'info-circle'}"></i> ${message}`;
+    document.getElementById('flashMessages').appendChild(flash);
+    setTimeout(() => flash.remove(), 5000);
+}
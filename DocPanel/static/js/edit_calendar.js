@@ -0,0 +1,70 @@
+let currentPatientId = null;
+
+function confirmAppointment(patientId) {
+    fetch(`/api/confirm_reservation/${patientId}`, { method: 'POST' })
+        .then(res => {
+            if (res.ok) {
+                alert('✅ Rendez-vous confirmé avec succès !');
+                location.reload();
+            } else {
+                res.json().then(data => {
+                    alert('❌ ' + (data.error || 'Erreur lors de la confirmation.'));
+                });
+            }
+        })
+        .catch(() => alert('❌ Erreur réseau.'));
+}
+
+function openRescheduleModal(patientId) {
+    currentPatientId = patientId;
+    document.getElementById('rescheduleModal').style.display = 'flex';
+}
+
+function submitReschedule() {
+    const newDate = document.getElementById('newDate').value;
+    const newTime = document.getElementById('newTime').value;
+    if (!newDate || !newTime) {
+        alert('يرجى تحديد التاريخ والوقت - Veuillez choisir date et heure.');
+        return;
+    }
+
+    fetch(`/api/reschedule_reservation/${currentPatientId}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ new_date: newDate, new_time: newTime })
+    })
+    .then(res => {
+        if (res.ok) {
+            closeModal('rescheduleModal');
+            alert('✅ Rendez-vous reporté avec succès !');
+            location.reload();
+        } else {
+            res.json().then(data => {
+                alert('❌ ' + (data.error || 'Erreur lors du report.'));
+            });
+        }
+    })
+    .catch(() => alert('❌ Erreur réseau.'));
+}
+
+function deleteAppointment(patientId) {
+    if (confirm('هل أنت متأكد من حذف هذا الموعد نهائياً؟\nVoulez-vous vraiment supprimer ce rendez-vous ?')) {
+        fetch(`/api/delete_reservation/${patientId}`, { method: 'DELETE' })
+            .then(res => {
+                if (res.ok) {
+                    alert('✅ Rendez-vous supprimé.');
+                    location.reload();
+                } else {
+                    res.json().then(data => {
+                        alert('❌ ' + (data.error || 'Erreur lors de la suppression.'));
+                    });
+                }
+            })
+            .catch(() => alert('❌ Erreur réseau.'));
+    }
+}
+
+function closeModal(modalId) {
+    document.getElementById(modalId).style.display = 'none';
+    currentPatientId = null;
+}
@@ -0,0 +1,208 @@
+// Variables globales
+let formData = {};
+let autoSaveTimer;
+
+// Expressions régulières pour validation
+const arabicRegex = /[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]/;
+const frenchRegex = /[a-zA-ZàâäéèêëïîôöùûüÿçÀÂÄÉÈÊËÏÎÔÖÙÛÜŸÇ]/;
+const phoneRegex = /^[\d+\-\s()]{8,20}$/;
+
+// Initialisation
+document.addEventListener('DOMContentLoaded', function() {
+    initializeForm();
+    setupValidation();
+    setupCharacterCounters();
+    updateProgress();
+});
+
+function initializeForm() {
+    const inputs = document.querySelectorAll('input, textarea');
+    inputs.forEach(input => {
+        formData[input.name] = input.value;
+
+        input.addEventListener('input', function() {
+            handleInputChange(this);
+        });
+
+        input.addEventListener('blur', function() {
+            validateField(this);
+        });
+
+        // Validation initiale
+        if (input.value) {
+            validateField(input);
+            updateCharacterCounter(input);
+        }
+    });
+}
+
+function handleInputChange(input) {
+    formData[input.name] = input.value;
+    validateField(input);
+    updateCharacterCounter(input);
+    updateProgress();
+}
+
+function validateField(input) {
+    const field = input.getAttribute('data-field');
+    const lang = input.getAttribute('data-lang');
+    const value = input.value.trim();
+    const validationIcon = input.parentElement.querySelector('.validation-status');
+
+    let isValid = true;
+    let errorMessage = '';
+
+    if (input.hasAttribute('required') && !value) {
+        isValid = false;
+        errorMessage = 'Champ requis - حقل مطلوب';
+    } else if (value) {
+        if (lang === 'ar' && !arabicRegex.test(value)) {
+            isValid = false;
+            errorMessage = 'استخدم النص العربي فقط';
+        } else if (lang === 'fr' && !frenchRegex.test(value)) {
+            isValid = false;
+            errorMessage = 'Utilisez uniquement le texte français';
+        } else if (input.type === 'tel' && !phoneRegex.test(value)) {
+            isValid = false;
+            errorMessage = 'Format de téléphone invalide - تنسيق هاتف غير صحيح';
+        }
+    }
+
+    // Mise à jour visuelle
+    if (validationIcon) {
+        if (isValid && value) {
+            validationIcon.innerHTML = '<i class="fas fa-check"></i>';
+            validationIcon.className = 'validation-status valid';
+            input.style.borderColor = '#28a745';
+        } else if (!isValid) {
+            validationIcon.innerHTML = '<i class="fas fa-times"></i>';
+            validationIcon.className = 'validation-status invalid';
+            input.style.borderColor = '#dc3545';
+            input.title = errorMessage;
+        } else {
+            validationIcon.className = 'validation-status';
+            input.style.borderColor = '#e9ecef';
+            input.title = '';
+        }
+    }
+
+    return isValid;
+}
+
+function updateCharacterCounter(input) {
+    const maxLength = input.getAttribute('maxlength');
+    const currentLength = input.value.length;
+    const counterId = input.getAttribute('data-target') || input.id;
+    const counter = document.querySelector(`[data-target="${counterId}"]`);
+
+    if (counter && maxLength) {
+        counter.textContent = `${currentLength}/${maxLength}`;
+
+        if (currentLength > maxLength * 0.9) {
+            counter.className = 'character-counter error';
+        } else if (currentLength > maxLength * 0.7) {
+            counter.className = 'character-counter warning';
+        } else {
+            counter.className = 'character-counter';
+        }
+    }
+}
+
+function setupCharacterCounters() {
+    document.querySelectorAll('input[maxlength], textarea[maxlength]').forEach(input => {
+        updateCharacterCounter(input);
+    });
+}
+
+function setupValidation() {
+    const form = document.getElementById('editProfileForm');
+    form.addEventListener('submit', function(e) {
+        if (!validateForm()) {
+            e.preventDefault();
+            showValidationErrors();
+        }
+    });
+}
+
+function validateForm() {
+    const inputs = document.querySelectorAll('input[required], textarea[required]');
+    let isValid = true;
+    let firstInvalidField = null;
+
+    inputs.forEach(input => {
+        if (!validateField(input)) {
+            isValid = false;
+            if (!firstInvalidField) {
+                firstInvalidField = input;
+            }
+        }
+    });
+
+    // Validation bilingue - s'assurer que les paires fr/ar sont complétées
+    const bilingualFields = ['nom', 'prenom', 'specialite', 'ville', 'quartier', 'adresse', 'type_diplome', 'secteur', 'activite'];
+
+    bilingualFields.forEach(field => {
+        const frInput = document.querySelector(`[name="${field}_fr"]`);
+        const arInput = document.querySelector(`[name="${field}_ar"]`);
+
+        if (frInput && arInput) {
+            if (frInput.value.trim() && !arInput.value.trim()) {
+                isValid = false;
+                if (!firstInvalidField) firstInvalidField = arInput;
+            } else if (arInput.value.trim() && !frInput.value.trim()) {
+                isValid = false;
+                if (!firstInvalidField) firstInvalidField = frInput;
+            }
+        }
+    });
+
+    if (firstInvalidField) {
+        firstInvalidField.focus();
+        firstInvalidField.scrollIntoView({ behavior: 'smooth', block: 'center' });
+    }
+
+    return isValid;
+}
+
+function showValidationErrors() {
+    const errorDiv = document.createElement('div');
+    errorDiv.className = 'flash-message error';
+    errorDiv.innerHTML = `
+        <i class="fas fa-exclamation-triangle"></i>
+        يرجى التحقق من الحقول المطلوبة وصحة البيانات - Veuillez vérifier les champs requis et la validité des données
+    `;
+
+    const form = document.getElementById('editProfileForm');
+    form.insertBefore(errorDiv, form.firstChild);
+
+    setTimeout(() => {
+        errorDiv.remove();
+    }, 5000);
+}
+
+function updateProgress() {
+    const totalFields = document.querySelectorAll('input[required], textarea[required]').length;
+    const completedFields = document.querySelectorAll('.validation-status.valid').length;
+    const progress = (completedFields / totalFields) * 100;
+
+    const progressFill = document.getElementById('progressFill');
+    if (progressFill) {
+        progressFill.style.width = `${Math.min(progress, 100)}%`;
+    }
+}
+
+// Raccourcis clavier
+document.addEventListener('keydown', function(e) {
+    // Ctrl + S pour sauvegarder
+    if (e.ctrlKey && e.key === 's') {
+        e.preventDefault();
+        document.getElementById('editProfileForm').submit();
+    }
+
+    // Échap pour annuler
+    if (e.key === 'Escape') {
+        if (confirm('هل تريد العودة بدون حفظ التغييرات؟ - Voulez-vous revenir sans sauvegarder ?')) {
+            window.location.href = DASHBOARD_URL;
+        }
+    }
+});
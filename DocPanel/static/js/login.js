@@ -0,0 +1,18 @@
+function switchLanguage(lang) {
+    const body = document.body;
+    document.querySelectorAll('.lang-btn').forEach(btn => btn.classList.remove('active'));
+    if(lang === 'ar') {
+        body.classList.add('rtl-support');
+        body.setAttribute('dir','rtl');
+        document.querySelector('.lang-btn:nth-child(1)').classList.add('active');
+    } else {
+        body.classList.remove('rtl-support');
+        body.setAttribute('dir','ltr');
+        document.querySelector('.lang-btn:nth-child(2)').classList.add('active');
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const userLang = navigator.language || navigator.userLanguage;
+    if(userLang.startsWith('ar')) { switchLanguage('ar'); }
+});
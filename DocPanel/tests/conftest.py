@@ -0,0 +1,88 @@
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# app.py lit sa configuration à l'import : aucune connexion n'est ouverte
+os.environ.setdefault("SUPABASE_URL", "http://tests.invalid")
+os.environ.setdefault("SUPABASE_KEY", "tests.offline.key")
+os.environ.setdefault("SECRET_KEY", "tests-secret")
+os.environ["SESSION_BACKEND"] = "memory"
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Base en mémoire branchée à la place de PostgREST le temps d'un test."""
+    import app
+    from fake_supabase import FakeSupabase
+
+    monkeypatch.setattr(app, "_db", app._db)
+    backend = FakeSupabase()
+    app.use_data_backend(backend)
+    # Les caches du worker survivent d'un test à l'autre (même médecin n° 1)
+    for cache in (app.events_cache, app.stats_cache, app.calendar_cache):
+        cache.invalidate(lambda key: True)
+    return backend
+
+
+@pytest.fixture
+def seed_patient(db):
+    """Ajoute une réservation (ligne patients) ; les colonnes passées en mot-clé remplacent les valeurs par défaut."""
+    def seed(patient_id, day="2030-01-07", time="09:00:00", status="reserved", doctor_id=1, **columns):
+        row = {
+            "id": patient_id,
+            "doctor_id": doctor_id,
+            "patient_nom": f"Patient {patient_id}",
+            "patient_date_reservation": day,
+            "patient_time_reservation": time,
+            "status": status,
+            "updated_at": "2030-01-01T00:00:00+00:00",
+            **columns,
+        }
+        db.seed("patients", [row])
+        return row
+
+    return seed
+
+
+@pytest.fixture
+def booked(db, seed_patient):
+    """Médecin n° 1 (calendrier vide) avec trois réservations : 7 et 8 janvier, 1er février 2030."""
+    db.seed("users", [{"id": 1, "email": "doctor@tests.local", "calendar": {}, "profile_data": {}}])
+    for patient_id, day in ((10, "2030-01-07"), (11, "2030-01-08"), (12, "2030-02-01")):
+        seed_patient(patient_id, day=day)
+    return db
+
+
+@pytest.fixture
+def client(db):
+    """Client de test connecté comme médecin n° 1 sur la base en mémoire."""
+    import app
+
+    test_client = app.app.test_client()
+    with test_client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["email"] = "doctor@tests.local"
+        sess["profile_data"] = {}
+    return test_client
+
+
+@pytest.fixture
+def doctor(db, monkeypatch):
+    """Médecin n° 1 inscrit (mot de passe « secret »), bcrypt au coût minimal."""
+    import bcrypt
+    import app
+
+    monkeypatch.setattr(app, "BCRYPT_ROUNDS", 4)
+    db.seed("users", [{
+        "id": 1,
+        "email": "doctor@tests.local",
+        "password_hash": bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode(),
+        "language": "fr",
+    }])
+    return db
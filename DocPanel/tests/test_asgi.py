@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import app
+import asgi
+
+WINDOW = "/api/events?start=2030-01-07&end=2030-01-14"
+
+
+@pytest.fixture
+def async_db(db, seed_patient, monkeypatch):
+    """Même base en mémoire, vue par le client asynchrone des routes ASYNC_ROUTES."""
+    monkeypatch.setattr(asgi, "_db", None)
+    asgi.use_async_data_backend(db.async_client())
+    db.seed("users", [{"id": 1, "email": "doctor@tests.local", "calendar": {}, "profile_data": {}}])
+    seed_patient(10)
+    return db
+
+
+def session_cookies(client):
+    """Cookie de la session ouverte par la fixture `client` (même stockage côté serveur)."""
+    name = app.app.config["SESSION_COOKIE_NAME"]
+    return {name: client.get_cookie(name).value}
+
+
+def asgi_requests(*requests, cookies=None):
+    async def main():
+        transport = httpx.ASGITransport(app=asgi.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t", cookies=cookies) as http:
+            return [await http.request(method, url, **kwargs) for method, url, kwargs in requests]
+
+    return asyncio.run(main())
+
+
+def test_wsgi_fallback_runs_requests_in_parallel():
+    threads = set()
+
+    def slow_app(environ, start_response):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.3)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+    async def main():
+        transport = httpx.ASGITransport(app=asgi.ThreadedWsgiToAsgi(slow_app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(client.get("/") for _ in range(4)))
+            return responses, time.perf_counter() - started
+
+    responses, elapsed = asyncio.run(main())
+    assert [r.text for r in responses] == ["ok"] * 4
+    assert elapsed < 1.0
+    assert len(threads) == 4 and all(name.startswith("wsgi") for name in threads)
+
+
+def test_fallback_serves_flask_routes(db):
+    async def main():
+        transport = httpx.ASGITransport(app=asgi.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            return await client.get("/healthz")
+
+    response = asyncio.run(main())
+    assert response.status_code == 200 and response.json() == {"status": "ok"}
+
+
+def test_async_events_revalidate_with_304(client, async_db):
+    cookies = session_cookies(client)
+    first, = asgi_requests(("GET", WINDOW, {}), cookies=cookies)
+    assert first.status_code == 200
+    assert "Patient 10" in first.text
+    assert "Server-Timing" in first.headers
+
+    calls = async_db.calls
+    second, = asgi_requests(("GET", WINDOW, {"headers": {"If-None-Match": first.headers["ETag"]}}), cookies=cookies)
+    assert second.status_code == 304
+    assert second.content == b""
+    assert async_db.calls == calls
+
+
+def test_async_events_without_session_are_empty(async_db):
+    response, = asgi_requests(("GET", WINDOW, {}))
+    assert response.status_code == 200 and response.json() == []
+
+
+def test_async_confirm_writes_and_invalidates(client, async_db):
+    cookies = session_cookies(client)
+    before, confirm, after = asgi_requests(
+        ("GET", WINDOW, {}),
+        ("POST", "/api/confirm_reservation/10", {}),
+        ("GET", WINDOW, {}),
+        cookies=cookies,
+    )
+    assert confirm.status_code == 200 and confirm.json() == {"message": "Rendez-vous confirmé"}
+    assert async_db.table("patients").select("status").eq("id", 10).execute().data == [{"status": "confirmed"}]
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+
+def test_async_dispatch_saves_the_session(client, async_db):
+    # Expiration glissante : la sauvegarde passe par process_response
+    cookies = session_cookies(client)
+    store = app.app.session_interface.store
+    sid = next(iter(cookies.values()))
+    payload, _ = store.load(sid)
+    store.save(sid, payload, time.time() + 60)
+    response, = asgi_requests(("GET", "/api/stats", {}), cookies=cookies)
+    assert response.status_code == 200
+    assert store.load(sid)[1] > time.time() + 3600
+
+
+def test_async_stream_requires_login(async_db):
+    response, = asgi_requests(("GET", "/api/events/stream", {}))
+    assert response.status_code == 401
+    assert response.json() == {"error": "Non autorisé"}
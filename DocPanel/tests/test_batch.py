@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.mark.parametrize("body", [[1, 2], "texte", 3, None])
+def test_batch_rejects_non_object_bodies(client, body):
+    response = client.post("/api/reservations/batch", json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_batch_requires_login(db):
+    import app
+
+    response = app.app.test_client().post("/api/reservations/batch", json={"operations": []})
+    assert response.status_code == 401
+
+
+def test_batch_reports_one_result_per_operation(client, db, seed_patient):
+    seed_patient(10)
+    seed_patient(11, time="10:00:00")
+    seed_patient(12, doctor_id=2)
+    response = client.post("/api/reservations/batch", json={"operations": [
+        {"action": "confirm", "patient_id": 10},
+        {"action": "delete", "patient_id": 11},
+        {"action": "confirm", "patient_id": 12},
+        {"action": "inconnue", "patient_id": 10},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [200, 200, 404, 400]
+    rows = {row["id"]: row for row in db.table("patients").select("*").execute().data}
+    assert rows[10]["status"] == "confirmed"
+    assert 11 not in rows
+    assert rows[12]["status"] == "reserved"
+
+
+def test_reschedule_with_array_body_is_a_validation_error(client, seed_patient):
+    seed_patient(10)
+    response = client.post("/api/reschedule_reservation/10", json=[1, 2])
+    assert response.status_code == 400
+
+
+def test_batch_rejects_a_repeated_patient_after_the_first_operation(client, db, seed_patient):
+    seed_patient(10)
+    seed_patient(11, time="10:00:00")
+    response = client.post("/api/reservations/batch", json={"operations": [
+        {"action": "reschedule", "patient_id": 10, "new_date": "2030-01-07", "new_time": "11:00"},
+        {"action": "reschedule", "patient_id": "10", "new_date": "2030-01-07", "new_time": "12:00"},
+        {"action": "delete", "patient_id": 10},
+        {"action": "confirm", "patient_id": 11},
+        {"action": "delete", "patient_id": 11},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [200, 409, 409, 200, 409]
+    assert results[1]["error"] == "Rendez-vous déjà présent dans le lot"
+    rows = {row["id"]: row for row in db.table("patients").select("*").execute().data}
+    assert rows[10]["patient_time_reservation"] == "11:00"
+    assert rows[11]["status"] == "confirmed"
@@ -0,0 +1,86 @@
+import gzip
+
+import brotli
+import pytest
+
+import app
+import delivery
+
+WINDOW = "/api/events?start=2030-01-07&end=2030-01-14"
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(delivery, "_etag_compressed", type(delivery._etag_compressed)())
+    monkeypatch.setattr(delivery, "_static_compressed", {})
+    monkeypatch.setattr(delivery, "COMPRESS_MIN_SIZE", 0)
+
+
+@pytest.mark.parametrize("accept, encoding, decode", [
+    ("gzip, br", "br", brotli.decompress),
+    ("gzip", "gzip", gzip.decompress),
+])
+def test_json_is_compressed_with_the_best_offer(client, booked, accept, encoding, decode):
+    plain = client.get(WINDOW)
+    response = client.get(WINDOW, headers={"Accept-Encoding": accept})
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decode(response.get_data()) == plain.get_data()
+
+
+def test_identity_keeps_the_strong_etag(client, booked):
+    response = client.get(WINDOW, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert not response.headers["ETag"].startswith("W/")
+
+
+def test_304_carries_the_same_validator_as_the_200(client, booked):
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get(WINDOW, headers=headers)
+    assert first.headers["ETag"].startswith('W/"')
+    revalidated = client.get(WINDOW, headers=dict(headers, **{"If-None-Match": first.headers["ETag"]}))
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == first.headers["ETag"]
+
+
+def test_streamed_responses_are_not_compressed(client, booked):
+    response = client.get("/api/reservations/export?format=csv", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert "Patient 10" in response.get_data(as_text=True)
+
+
+def test_versioned_assets_are_immutable(db):
+    with app.app.test_request_context():
+        url = delivery.asset_url("css/dashboard.css")
+    assert "?v=" in url
+    response = app.app.test_client().get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    cache_control = response.headers["Cache-Control"]
+    assert "immutable" in cache_control and f"max-age={delivery.STATIC_MAX_AGE}" in cache_control
+    assert "no-cache" not in cache_control
+    assert response.headers["Content-Encoding"] == "gzip"
+
+    unversioned = app.app.test_client().get("/static/css/dashboard.css")
+    assert "immutable" not in unversioned.headers.get("Cache-Control", "")
+
+
+def test_compressed_bodies_are_reused_by_etag(client, booked, monkeypatch):
+    calls = []
+    compress = delivery.compress
+    monkeypatch.setattr(delivery, "compress", lambda data, encoding, static=False: calls.append(encoding) or compress(data, encoding, static))
+    for _ in range(3):
+        client.get(WINDOW, headers={"Accept-Encoding": "gzip"})
+    client.get(WINDOW, headers={"Accept-Encoding": "br"})
+    assert calls == ["gzip", "br"]
+
+
+def test_etag_cache_is_bounded(client, booked, monkeypatch):
+    monkeypatch.setattr(delivery, "ETAG_CACHE_SIZE", 2)
+    # Trois fenêtres, trois contenus (deux, une, aucune réservation) : trois ETag
+    etags = [
+        client.get(f"/api/events?start={start}&end=2030-01-14", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+        for start in ("2030-01-07", "2030-01-08", "2030-01-09")
+    ]
+    assert len(set(etags)) == 3
+    assert [etag for etag, _ in delivery._etag_compressed] == [etag[3:-1] for etag in etags[1:]]
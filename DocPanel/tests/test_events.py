@@ -0,0 +1,34 @@
+WINDOW = "/api/events?start=2030-01-07&end=2030-01-14"
+
+
+def test_events_are_scoped_to_the_window(client, booked):
+    response = client.get(WINDOW)
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    body = response.get_data(as_text=True)
+    assert "Patient 10" in body and "Patient 11" in body and "Patient 12" not in body
+
+
+def test_matching_etag_answers_304_from_cache(client, booked):
+    etag = client.get(WINDOW).headers["ETag"]
+    calls = booked.calls
+    response = client.get(WINDOW, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert booked.calls == calls
+
+
+def test_write_invalidates_the_etag(client, booked):
+    etag = client.get(WINDOW).headers["ETag"]
+    assert client.post("/api/confirm_reservation/10").status_code == 200
+    response = client.get(WINDOW, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_events_without_session_are_empty(db):
+    import app
+
+    response = app.app.test_client().get(WINDOW)
+    assert response.status_code == 200 and response.get_json() == []
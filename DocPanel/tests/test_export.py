@@ -0,0 +1,113 @@
+import csv
+import io
+
+import pytest
+
+import app
+
+PAGE_SIZE = 3
+DAYS = ("2024-01-01", "2024-01-02", "2024-01-03")
+
+
+def seed(seed_patient, count, doctor_id="d1", days=DAYS):
+    """`count` réservations réparties sur `days` (plusieurs par jour, pour traverser les pages en plein jour)."""
+    rows = [seed_patient(f"p{i:04d}", day=days[i % len(days)], doctor_id=doctor_id) for i in range(count)]
+    return sorted((row["patient_date_reservation"], row["id"]) for row in rows)
+
+
+def keys(rows):
+    return [(row["patient_date_reservation"], row["id"]) for row in rows]
+
+
+@pytest.mark.parametrize("count", [
+    0, 1, PAGE_SIZE - 1, PAGE_SIZE, PAGE_SIZE + 1,
+    2 * PAGE_SIZE, 2 * PAGE_SIZE + 1, 3 * PAGE_SIZE * len(DAYS),
+])
+def test_keyset_returns_every_row_once_in_order(seed_patient, count):
+    expected = seed(seed_patient, count)
+    assert keys(app.iter_reservations_keyset("d1", page_size=PAGE_SIZE)) == expected
+
+
+@pytest.mark.parametrize("count", [PAGE_SIZE, 2 * PAGE_SIZE, 2 * PAGE_SIZE + 1])
+def test_keyset_page_boundary_inside_a_single_day(seed_patient, count):
+    expected = seed(seed_patient, count, days=DAYS[:1])
+    assert keys(app.iter_reservations_keyset("d1", page_size=PAGE_SIZE)) == expected
+
+
+def test_keyset_respects_window_and_doctor(seed_patient):
+    expected = seed(seed_patient, 20)
+    seed(seed_patient, 5, doctor_id="d2")
+    rows = app.iter_reservations_keyset("d1", "2024-01-02", "2024-01-03", page_size=PAGE_SIZE)
+    assert keys(rows) == [key for key in expected if key[0] == "2024-01-02"]
+
+
+def test_keyset_stops_on_short_page(db, seed_patient):
+    seed(seed_patient, PAGE_SIZE - 1)
+    list(app.iter_reservations_keyset("d1", page_size=PAGE_SIZE))
+    assert db.calls == 1
+
+
+def test_keyset_is_lazy(db, seed_patient):
+    seed(seed_patient, 4 * PAGE_SIZE)
+    rows = app.iter_reservations_keyset("d1", page_size=PAGE_SIZE)
+    assert db.calls == 0
+    next(rows)
+    assert db.calls == 1
+
+
+def test_export_route_streams_csv_rows_in_order(client, seed_patient):
+    expected = seed(seed_patient, 7, doctor_id=1)
+    seed(seed_patient, 2, doctor_id=2)
+    response = client.get("/api/reservations/export?format=csv&start=2024-01-01&end=2024-01-03")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.headers["Cache-Control"] == "no-store"
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True).lstrip("\ufeff"))))
+    assert rows[0][:2] == ["id", "patient"]
+    assert [(row[4], row[0]) for row in rows[1:]] == [key for key in expected if key[0] < "2024-01-03"]
+
+
+def test_export_route_ics_has_one_event_per_reservation(client, seed_patient):
+    seed(seed_patient, 4, doctor_id=1)
+    body = client.get("/api/reservations/export?format=ics").get_data(as_text=True)
+    assert body.startswith("BEGIN:VCALENDAR") and body.endswith("END:VCALENDAR\r\n")
+    assert body.count("BEGIN:VEVENT") == 4
+
+
+def test_export_route_rejects_unknown_format(client, db):
+    assert client.get("/api/reservations/export?format=xlsx").status_code == 400
+
+
+def test_keyset_skips_rows_without_a_date(seed_patient):
+    # Sans filtre, la première page se terminerait sur une ligne sans date
+    expected = seed(seed_patient, PAGE_SIZE - 1)
+    for i in range(PAGE_SIZE):
+        seed_patient(f"z{i}", day=None, doctor_id="d1")
+    assert keys(app.iter_reservations_keyset("d1", page_size=PAGE_SIZE)) == expected
+
+
+def test_csv_neutralizes_formula_cells():
+    from exports import csv_lines
+
+    reservation = {
+        "patient_id": "p1", "patient_name": "=HYPERLINK(\"http://x\")", "patient_phone": "+212600000000",
+        "patient_email": "@SUM(A1)", "date": "2024-01-01", "time": "09:00:00", "status": "reserved",
+        "start": "2024-01-01T09:00:00", "end": "2024-01-01T09:30:00",
+    }
+    rows = list(csv.reader(io.StringIO("".join(csv_lines([reservation, dict(reservation, patient_name="-1+1")])))))
+    assert rows[1][1:4] == ["'=HYPERLINK(\"http://x\")", "'+212600000000", "'@SUM(A1)"]
+    assert rows[2][1] == "'-1+1"
+
+
+def test_ics_escapes_carriage_returns():
+    from exports import ics_lines
+
+    reservation = {
+        "patient_id": "p1", "patient_name": "Eve\rATTENDEE:mailto:x@evil", "patient_phone": "06\r\n07",
+        "patient_email": "", "date": "2024-01-01", "time": "09:00:00", "status": "reserved",
+        "start": "2024-01-01T09:00:00", "end": "2024-01-01T09:30:00",
+    }
+    body = "".join(ics_lines([reservation]))
+    assert "SUMMARY:Eve\\nATTENDEE:mailto:x@evil\r\n" in body
+    assert "\r" not in body.replace("\r\n", "")
+    assert not any(line.startswith("ATTENDEE") for line in body.split("\r\n"))
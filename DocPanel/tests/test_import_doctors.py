@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+import import_doctors
+from fake_supabase import FakeQuery, FakeSupabase
+from import_doctors import DoctorImporter, batches, read_rows
+from test_profiles import VALID
+
+
+class InlinePool:
+    """Même interface que ProcessPoolExecutor.map, sans processus."""
+
+    def map(self, fn, items, chunksize=1):
+        return list(map(fn, items))
+
+
+def row(email, **fields):
+    return {**VALID, "email": email, "password": "secret1", **fields}
+
+
+def importer(db, **kwargs):
+    return DoctorImporter(db, lambda pwd: f"hash:{pwd}", InlinePool(), **kwargs)
+
+
+def emails(db):
+    return sorted(user["email"] for user in db.tables.get("users", []))
+
+
+def test_duplicates_in_file_and_database_are_rejected():
+    db = FakeSupabase()
+    db.seed("users", [{"email": "taken@example.com"}])
+    imp = importer(db)
+    imp.process([
+        (2, row("new@example.com")),
+        (3, row("NEW@example.com")),
+        (4, row("taken@example.com")),
+        (5, row("bad", password="123")),
+    ])
+    assert imp.imported == 1
+    assert emails(db) == ["new@example.com", "taken@example.com"]
+    assert {e["line"]: e["errors"] for e in imp.errors} == {
+        3: ["Email en double dans le fichier."],
+        4: ["Email déjà utilisé."],
+        5: ["Email invalide.", "Le mot de passe doit faire au moins 6 caractères."],
+    }
+    user = next(u for u in db.tables["users"] if u["email"] == "new@example.com")
+    assert user["password_hash"] == "hash:secret1"
+    assert user["profile_data"]["email"] == "new@example.com"
+
+
+def test_existing_emails_are_checked_in_chunks(monkeypatch):
+    monkeypatch.setattr(import_doctors, "EMAIL_CHECK_CHUNK", 3)
+    db = FakeSupabase()
+    db.seed("users", [{"email": "d6@example.com"}])
+    imp = importer(db, dry_run=True)
+    imp.process([(i, row(f"d{i}@example.com")) for i in range(7)])
+    assert db.calls == 3
+    assert imp.imported == 6
+    assert [e["email"] for e in imp.errors] == ["d6@example.com"]
+
+
+class RejectingQuery(FakeQuery):
+    def execute(self):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        if self.operation == "insert" and any(user["email"].startswith("refused") for user in payload):
+            raise RuntimeError("violation de contrainte")
+        return super().execute()
+
+
+class RejectingSupabase(FakeSupabase):
+    query_class = RejectingQuery
+
+
+def test_failed_batch_falls_back_to_row_by_row_inserts():
+    db = RejectingSupabase()
+    imp = importer(db)
+    imp.process([(2, row("a@example.com")), (3, row("refused@example.com")), (4, row("b@example.com"))])
+    assert emails(db) == ["a@example.com", "b@example.com"]
+    assert imp.imported == 2
+    assert [(e["line"], e["email"]) for e in imp.errors] == [(3, "refused@example.com")]
+    assert imp.errors[0]["errors"][0].startswith("Insertion refusée")
+
+
+def test_read_rows_flags_invalid_jsonl_lines(tmp_path):
+    path = tmp_path / "medecins.jsonl"
+    path.write_text("\n".join([
+        json.dumps(row("a@example.com")), "", "{pas du json", "[1, 2]", json.dumps(row("b@example.com")),
+    ]), encoding="utf-8")
+    rows = list(read_rows(str(path)))
+    assert [line_no for line_no, _ in rows] == [1, 3, 4, 5]
+    assert rows[1][1] == rows[2][1] == {"__invalid__": True}
+
+    imp = importer(FakeSupabase())
+    imp.process(rows)
+    assert imp.imported == 2
+    assert [(e["line"], e["errors"]) for e in imp.errors] == [(3, ["Ligne JSON invalide"]), (4, ["Ligne JSON invalide"])]
+
+
+def test_read_rows_numbers_csv_lines_after_the_header(tmp_path):
+    path = tmp_path / "medecins.csv"
+    path.write_text("\ufeffemail,password\na@example.com,secret1\nb@example.com,secret2\n", encoding="utf-8")
+    assert list(read_rows(str(path))) == [
+        (2, {"email": "a@example.com", "password": "secret1"}),
+        (3, {"email": "b@example.com", "password": "secret2"}),
+    ]
+
+
+@pytest.mark.parametrize("count, sizes", [(0, []), (5, [2, 2, 1]), (4, [2, 2])])
+def test_batches(count, sizes):
+    assert [len(batch) for batch in batches(range(count), 2)] == sizes
@@ -0,0 +1,24 @@
+import pytest
+
+import app
+import instrumentation
+
+
+@pytest.fixture
+def anonymous(db):
+    return app.app.test_client()
+
+
+def test_metrics_are_denied_without_a_configured_token(anonymous, monkeypatch):
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", None)
+    assert anonymous.get("/metrics").status_code == 401
+    assert anonymous.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 401
+
+
+def test_metrics_require_the_bearer_token(anonymous, monkeypatch):
+    monkeypatch.setattr(instrumentation, "METRICS_TOKEN", "s3cret")
+    assert anonymous.get("/metrics", headers={"Authorization": "Bearer autre"}).status_code == 401
+    anonymous.get("/healthz")
+    response = anonymous.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert b"docpanel_request_duration_seconds" in response.data
@@ -0,0 +1,61 @@
+import threading
+
+import bcrypt
+import pytest
+
+import app
+
+LOGIN = {"email": "doctor@tests.local", "password": "secret"}
+
+
+def stored_hash(db):
+    return db.table("users").select("password_hash").eq("id", 1).execute().data[0]["password_hash"]
+
+
+@pytest.fixture
+def exhausted(monkeypatch):
+    """Toutes les places du pool bcrypt prises : la requête suivante n'attend pas."""
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(app, "password_slots", slots)
+    monkeypatch.setattr(app, "PASSWORD_QUEUE_TIMEOUT", 0.01)
+
+
+def test_login_answers_429_when_the_pool_is_full(doctor, exhausted):
+    response = app.app.test_client().post("/login", data=LOGIN)
+    assert response.status_code == 429
+    assert "Serveur occupé" in response.get_data(as_text=True)
+
+
+def test_register_answers_429_when_the_pool_is_full(db, exhausted):
+    response = app.app.test_client().post("/register", data={
+        "email": "new@tests.local", "password": "secret", "confirm_password": "secret",
+    })
+    assert response.status_code == 429
+    assert not db.tables.get("users")
+
+
+def test_login_rewrites_a_hash_at_another_cost(doctor, monkeypatch):
+    monkeypatch.setattr(app, "BCRYPT_ROUNDS", 5)
+    assert app.app.test_client().post("/login", data=LOGIN).status_code == 302
+    pwd_hash = stored_hash(doctor)
+    assert pwd_hash.startswith("$2b$05$")
+    assert bcrypt.checkpw(b"secret", pwd_hash.encode())
+
+
+def test_login_keeps_a_hash_at_the_configured_cost(doctor):
+    before = stored_hash(doctor)
+    assert app.app.test_client().post("/login", data=LOGIN).status_code == 302
+    assert stored_hash(doctor) == before
+
+
+@pytest.mark.parametrize("pwd_hash, expected", [
+    ("$2b$04$" + "a" * 53, False),
+    ("$2b$12$" + "a" * 53, True),
+    ("$2b$xx$" + "a" * 53, False),
+    ("pas-un-hash", False),
+    ("", False),
+])
+def test_password_needs_rehash(monkeypatch, pwd_hash, expected):
+    monkeypatch.setattr(app, "BCRYPT_ROUNDS", 4)
+    assert app.password_needs_rehash(pwd_hash) is expected
@@ -0,0 +1,66 @@
+from profiles import PROFILE_FORM_FIELDS, build_profile_data, validate_profile
+
+VALID = {
+    "nom_fr": "Bennani", "nom_ar": "بناني",
+    "prenom_fr": "Salma", "prenom_ar": "سلمى",
+    "specialite_fr": "Cardiologie", "specialite_ar": "أمراض القلب",
+    "ville_fr": "Rabat", "ville_ar": "الرباط",
+    "quartier_fr": "Agdal", "quartier_ar": "أكدال",
+    "adresse_fr": "12 avenue de France", "adresse_ar": "12 شارع فرنسا",
+    "type_diplome_fr": "Doctorat", "type_diplome_ar": "دكتوراه",
+    "secteur_fr": "Privé", "secteur_ar": "خاص",
+    "activite_fr": "Consultations", "activite_ar": "استشارات",
+    "tel": "0600000000", "email": "salma@example.com",
+}
+
+# Messages de la validation d'origine (app.py avant profiles.py), dans le même ordre
+BASELINE_REQUIRED = [
+    "Nom (Français) est obligatoire", "الاسم (عربي) est obligatoire",
+    "Prénom (Français) est obligatoire", "الاسم الأول (عربي) est obligatoire",
+    "Spécialité (Français) est obligatoire", "التخصص (عربي) est obligatoire",
+    "Ville (Français) est obligatoire", "المدينة (عربي) est obligatoire",
+    "Quartier (Français) est obligatoire", "الحي (عربي) est obligatoire",
+    "Adresse (Français) est obligatoire", "العنوان (عربي) est obligatoire",
+    "Type de diplôme (Français) est obligatoire", "نوع الشهادة (عربي) est obligatoire",
+    "Secteur (Français) est obligatoire", "القطاع (عربي) est obligatoire",
+    "Activité (Français) est obligatoire", "النشاط (عربي) est obligatoire",
+    "Téléphone est obligatoire", "Email est obligatoire",
+]
+
+
+def test_valid_profile_has_no_errors():
+    assert validate_profile(VALID) == []
+
+
+def test_required_messages_match_baseline():
+    assert validate_profile({}) == BASELINE_REQUIRED
+    assert validate_profile({field: "   " for field in PROFILE_FORM_FIELDS}) == BASELINE_REQUIRED
+
+
+def test_single_missing_field():
+    assert validate_profile(dict(VALID, tel="")) == ["Téléphone est obligatoire"]
+
+
+def test_language_messages_match_baseline():
+    data = dict(VALID, nom_fr="بناني", type_diplome_fr="123", nom_ar="Bennani", activite_ar="Consultations")
+    assert validate_profile(data) == [
+        "Le champ nom (Français) doit contenir du texte en français",
+        "Le champ type_diplome (Français) doit contenir du texte en français",
+        "Le champ nom (العربية) doit contenir du texte en arabe",
+        "Le champ activite (العربية) doit contenir du texte en arabe",
+    ]
+
+
+def test_required_errors_come_before_language_errors():
+    data = dict(VALID, email="", ville_ar="Rabat")
+    assert validate_profile(data) == [
+        "Email est obligatoire",
+        "Le champ ville (العربية) doit contenir du texte en arabe",
+    ]
+
+
+def test_build_profile_data_strips_values():
+    profile = build_profile_data(dict(VALID, nom_fr="  Bennani ", tel=" 0600000000 "))
+    assert profile["nom"] == {"fr": "Bennani", "ar": "بناني"}
+    assert profile["tel"] == "0600000000"
+    assert profile["email"] == "salma@example.com"
@@ -0,0 +1,80 @@
+import pytest
+
+from slots import iter_calendar_slots, normalize_recurrence
+
+MONDAY_MORNINGS = {"rules": [{"weekdays": [0], "start": "09:00", "end": "10:00", "slot_minutes": 30}], "exceptions": []}
+
+
+def starts(calendar, start, end):
+    return [slot["start"] for slot in iter_calendar_slots(calendar, start, end)]
+
+
+def test_rules_expand_within_window():
+    assert starts({"recurrence": MONDAY_MORNINGS}, "2024-01-01", "2024-01-15") == [
+        "2024-01-01T09:00:00", "2024-01-01T09:30:00",
+        "2024-01-08T09:00:00", "2024-01-08T09:30:00",
+    ]
+
+
+def test_window_end_is_exclusive():
+    assert starts({"recurrence": MONDAY_MORNINGS}, "2024-01-02", "2024-01-08") == []
+
+
+def test_exceptions_skip_whole_days():
+    recurrence = dict(MONDAY_MORNINGS, exceptions=["2024-01-08"])
+    assert starts({"recurrence": recurrence}, "2024-01-01", "2024-01-15") == [
+        "2024-01-01T09:00:00", "2024-01-01T09:30:00",
+    ]
+
+
+def test_explicit_week_overrides_rules_for_that_week_only():
+    calendar = {
+        "2024-01-08": [{"start": "2024-01-10T15:00:00", "end": "2024-01-10T15:30:00"}],
+        "recurrence": MONDAY_MORNINGS,
+    }
+    assert starts(calendar, "2024-01-01", "2024-01-22") == [
+        "2024-01-10T15:00:00",
+        "2024-01-01T09:00:00", "2024-01-01T09:30:00",
+        "2024-01-15T09:00:00", "2024-01-15T09:30:00",
+    ]
+
+
+def test_empty_explicit_week_still_overrides_rules():
+    calendar = {"2024-01-01": [], "recurrence": MONDAY_MORNINGS}
+    assert starts(calendar, "2024-01-01", "2024-01-08") == []
+
+
+def test_explicit_weeks_outside_window_are_skipped():
+    calendar = {"2024-03-04": [{"start": "2024-03-04T09:00:00", "end": "2024-03-04T09:30:00"}]}
+    assert starts(calendar, "2024-01-01", "2024-01-08") == []
+
+
+def test_rule_bounds_are_inclusive():
+    rule = dict(MONDAY_MORNINGS["rules"][0], **{"from": "2024-01-08", "until": "2024-01-15"})
+    assert starts({"recurrence": {"rules": [rule]}}, "2024-01-01", "2024-01-29") == [
+        "2024-01-08T09:00:00", "2024-01-08T09:30:00",
+        "2024-01-15T09:00:00", "2024-01-15T09:30:00",
+    ]
+
+
+def test_normalize_recurrence_sorts_and_fills_defaults():
+    recurrence = normalize_recurrence({
+        "rules": [{"weekdays": ["2", 0, 2], "start": "09:00", "end": "12:00"}],
+        "exceptions": ["2024-01-08", "2024-01-01", "2024-01-08"],
+    })
+    assert recurrence == {
+        "rules": [{"weekdays": [0, 2], "start": "09:00", "end": "12:00", "slot_minutes": 30, "from": None, "until": None}],
+        "exceptions": ["2024-01-01", "2024-01-08"],
+    }
+
+
+@pytest.mark.parametrize("data", [
+    [],
+    {"rules": [{"weekdays": [0], "start": "10:00"}]},
+    {"rules": [{"weekdays": [7], "start": "09:00", "end": "10:00"}]},
+    {"rules": [{"weekdays": [0], "start": "10:00", "end": "09:00"}]},
+    {"exceptions": ["08/01/2024"]},
+])
+def test_normalize_recurrence_rejects_invalid_rules(data):
+    with pytest.raises(ValueError):
+        normalize_recurrence(data)
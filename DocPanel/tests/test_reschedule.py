@@ -0,0 +1,87 @@
+from postgrest import APIError
+
+import app
+
+
+def enforce_no_overlap(db, monkeypatch):
+    """Reproduit la contrainte patients_no_overlap sur la base en mémoire."""
+    run = db.run
+
+    def guarded(query):
+        if query.table == "patients" and query.operation == "update" and "patient_time_reservation" in query.payload:
+            taken = [
+                row for row in db.table("patients").select("*").execute().data
+                if row["status"] != "cancelled"
+                and row["patient_date_reservation"] == query.payload["patient_date_reservation"]
+                and row["patient_time_reservation"][:5] == query.payload["patient_time_reservation"][:5]
+            ]
+            if taken:
+                raise APIError({"code": "23P01", "message": "conflicting key value violates exclusion constraint"})
+        return run(query)
+
+    monkeypatch.setattr(db, "run", guarded)
+
+
+def finish(flow, response):
+    """Termine un flux déjà amorcé, comme app.run_sync."""
+    error = None
+    while True:
+        try:
+            query = flow.throw(error) if error else flow.send(response)
+        except StopIteration as stop:
+            return stop.value
+        response, error = None, None
+        try:
+            response = query.execute()
+        except Exception as e:
+            error = e
+
+
+def move(patient_id, new_time="11:00"):
+    return [{"action": "reschedule", "patient_id": patient_id, "new_date": "2030-01-07", "new_time": new_time}]
+
+
+def test_concurrent_reschedules_to_the_same_slot_yield_one_conflict(db, seed_patient, monkeypatch):
+    seed_patient(10, time="09:00:00")
+    seed_patient(11, time="10:00:00")
+    enforce_no_overlap(db, monkeypatch)
+    first = app.reservation_operations_flow(db, 1, move(10))
+    second = app.reservation_operations_flow(db, 1, move(11))
+
+    # Les deux contrôles de conflit lisent l'état avant toute écriture
+    first_booked = next(first).execute()
+    second_booked = next(second).execute()
+    assert finish(first, first_booked)[0]["status"] == 200
+    result = finish(second, second_booked)[0]
+    assert result["status"] == 409 and result["error"] == "Créneau déjà réservé"
+
+    rows = {row["id"]: row for row in db.table("patients").select("*").execute().data}
+    assert rows[10]["patient_time_reservation"] == "11:00"
+    assert rows[11]["patient_time_reservation"] == "10:00:00"
+
+
+def test_conflict_is_reported_as_409_by_the_route(client, db, seed_patient, monkeypatch):
+    seed_patient(10, time="09:00:00")
+    enforce_no_overlap(db, monkeypatch)
+    seed_patient(11, time="10:00:00")
+    # Le créneau est pris après le contrôle : seule la contrainte le voit
+    monkeypatch.setattr(app, "booked_reservations_query", lambda client, doctor_id, dates: client.table("patients").select("id").eq("id", -1))
+    response = client.post("/api/reschedule_reservation/10", json={"new_date": "2030-01-07", "new_time": "10:00"})
+    assert response.status_code == 409
+
+
+def test_other_write_errors_still_fail(db, seed_patient, monkeypatch):
+    seed_patient(10, time="09:00:00")
+
+    def broken(query):
+        raise APIError({"code": "42501", "message": "permission denied"})
+
+    flow = app.reservation_operations_flow(db, 1, move(10))
+    booked = next(flow).execute()
+    monkeypatch.setattr(db, "run", broken)
+    try:
+        finish(flow, booked)
+    except APIError as e:
+        assert e.code == "42501"
+    else:
+        raise AssertionError("APIError attendue")
@@ -0,0 +1,20 @@
+from datetime import date, timedelta
+
+import app
+
+
+def test_calendar_page_window_defaults_to_today_onward():
+    window = app.calendar_page_window({}, today=date(2024, 1, 10))
+    assert (window["start"], window["end"]) == ("2024-01-10", (date(2024, 1, 10) + timedelta(days=app.CALENDAR_PAGE_DAYS)).isoformat())
+
+
+def test_calendar_page_window_navigation_keeps_span():
+    window = app.calendar_page_window({"start": "2024-01-10", "end": "2024-01-17"})
+    assert window["last_day"] == "2024-01-16"
+    assert window["prev"] == {"start": "2024-01-03", "end": "2024-01-10"}
+    assert window["next"] == {"start": "2024-01-17", "end": "2024-01-24"}
+
+
+def test_calendar_page_window_ignores_inverted_bounds():
+    window = app.calendar_page_window({"start": "2024-01-10", "end": "2024-01-01"})
+    assert window["start"] == "2024-01-10" and window["end"] > window["start"]
@@ -0,0 +1,83 @@
+import pytest
+
+from search import DoctorSearchIndex, normalize_text, tokenize
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Cardiologie", ["cardiologie"]),
+    ("Pédiatre à Fès", ["pediatre", "fes"]),
+    ("SŒUR œil", ["soeur", "oeil"]),
+    ("Gynéco-obstétrique", ["gyneco", "obstetrique"]),
+    ("a b c", []),                                    # jetons trop courts
+    ("", []),
+    (None, []),
+])
+def test_tokenize_french(text, expected):
+    assert tokenize(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("القلب", ["قلب"]),                              # article retiré
+    ("الدار البيضاء", ["دار", "بيضاء"]),
+    ("طبيب أطفال", ["طبيب", "اطفال"]),               # hamza portée
+    ("مدينة", ["مدينه"]),                            # ta marbouta
+    ("مستشفى", ["مستشفي"]),                          # alif maqsura
+    ("طَبِيب", ["طبيب"]),                             # harakat
+    ("طـــبيب", ["طبيب"]),                            # tatweel
+])
+def test_tokenize_arabic(text, expected):
+    assert tokenize(text) == expected
+
+
+def test_normalize_text_is_idempotent():
+    text = "Médecine générale — الطب العام"
+    assert normalize_text(normalize_text(text)) == normalize_text(text)
+
+
+def test_index_prefix_and_accents():
+    index = DoctorSearchIndex()
+    index.update(1, {"specialite": {"fr": "Pédiatrie", "ar": "طب الأطفال"}, "ville": {"fr": "Fès", "ar": "فاس"}})
+    index.update(2, {"specialite": {"fr": "Cardiologie", "ar": "أمراض القلب"}, "ville": {"fr": "Rabat", "ar": "الرباط"}})
+    assert [d["id"] for d in index.search("pedia")] == ["1"]
+    assert [d["id"] for d in index.search("", ville="الرباط")] == ["2"]
+    assert index.search("cardio", ville="fes") == []
+    index.update(2, None)
+    assert index.search("cardio") == [] and len(index) == 1
+
+
+def test_refresh_picks_up_late_writes_within_margin(db, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "doctor_index", DoctorSearchIndex())
+    monkeypatch.setattr(app, "_search_state", {"watermark": None, "refreshed_at": None})
+    db.seed("users", [{"id": "1", "updated_at": "2024-01-01T10:00:10+00:00",
+                       "profile_data": {"specialite": {"fr": "Cardiologie"}}}])
+    app.refresh_doctor_index()
+    assert app._search_state["watermark"] == "2024-01-01T10:00:10+00:00"
+
+    # Validée après la lecture précédente, mais horodatée juste avant le dernier updated_at vu
+    db.seed("users", [{"id": "2", "updated_at": "2024-01-01T10:00:08+00:00",
+                       "profile_data": {"specialite": {"fr": "Cardiologie"}}}])
+    app.refresh_doctor_index()
+    assert [d["id"] for d in app.doctor_index.search("cardio")] == ["1", "2"]
+    assert app._search_state["watermark"] == "2024-01-01T10:00:10+00:00"
+
+
+def test_search_route_loads_index_and_filters_by_city(db, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "doctor_index", DoctorSearchIndex())
+    monkeypatch.setattr(app, "_search_state", {"watermark": None, "refreshed_at": None})
+    db.seed("users", [
+        {"id": "1", "updated_at": "2024-01-01T10:00:00+00:00",
+         "profile_data": {"specialite": {"fr": "Pédiatrie"}, "ville": {"fr": "Fès", "ar": "فاس"}}},
+        {"id": "2", "updated_at": "2024-01-01T10:00:00+00:00",
+         "profile_data": {"specialite": {"fr": "Pédiatrie"}, "ville": {"fr": "Rabat", "ar": "الرباط"}}},
+    ])
+    client = app.app.test_client()
+    response = client.get("/api/doctors/search?q=pedia&ville=فاس")
+    assert response.status_code == 200
+    assert [d["id"] for d in response.get_json()["results"]] == ["1"]
+    assert client.get("/api/doctors/search").status_code == 400
+    assert client.get("/api/doctors/search?q=pedia&limit=x").status_code == 400
+
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+import app
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore()
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+
+
+def test_store_roundtrip_and_delete(store):
+    store.save("sid", '{"user_id": 1}', time.time() + 60)
+    assert store.load("sid")[0] == '{"user_id": 1}'
+    store.delete("sid")
+    assert store.load("sid") is None
+
+
+def test_store_returns_expiry(store):
+    expires = time.time() + 60
+    store.save("sid", "{}", expires)
+    assert store.load("sid")[1] == pytest.approx(expires)
+
+
+def test_store_ignores_expired_sessions(store):
+    store.save("sid", "{}", time.time() - 1)
+    assert store.load("sid") is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(maxsize=2)
+    for sid in ("a", "b"):
+        store.save(sid, "{}", time.time() + 60)
+    store.load("a")
+    store.save("c", "{}", time.time() + 60)
+    assert store.load("b") is None and store.load("a")[0] == "{}"
+
+
+def session_id(client):
+    cookie = client.get_cookie(app.app.config["SESSION_COOKIE_NAME"])
+    return cookie.value if cookie else None
+
+
+def test_cookie_only_carries_an_opaque_id(db):
+    client = app.app.test_client()
+    client.get("/set_language/ar")
+    sid = session_id(client)
+    assert sid and "display_language" not in sid
+    assert "ar" in app.app.session_interface.store.load(sid)[0]
+
+
+def test_login_and_logout_rotate_the_session_id(doctor):
+    store = app.app.session_interface.store
+    client = app.app.test_client()
+    client.get("/set_language/ar")
+    anonymous = session_id(client)
+
+    response = client.post("/login", data={"email": "doctor@tests.local", "password": "secret"})
+    assert response.status_code == 302
+    logged_in = session_id(client)
+    assert logged_in != anonymous
+    assert store.load(anonymous) is None
+    assert '"user_id"' in store.load(logged_in)[0]
+
+    client.get("/logout")
+    assert session_id(client) != logged_in
+    assert store.load(logged_in) is None
+    assert client.get("/dashboard").status_code == 302
+
+
+@pytest.fixture
+def short_lived(db, monkeypatch):
+    interface = app.app.session_interface
+    monkeypatch.setattr(interface, "lifetime", 100)
+    client = app.app.test_client()
+    client.get("/set_language/ar")
+    return interface.store, session_id(client), client
+
+
+def test_idle_session_expiry_slides_after_half_lifetime(short_lived):
+    store, sid, client = short_lived
+    payload, _ = store.load(sid)
+    store.save(sid, payload, time.time() + 30)
+    client.get("/healthz")
+    assert store.load(sid) == (payload, pytest.approx(time.time() + 100, abs=5))
+
+
+def test_recent_session_is_not_rewritten(short_lived):
+    store, sid, client = short_lived
+    payload, _ = store.load(sid)
+    expires = time.time() + 80
+    store.save(sid, payload, expires)
+    client.get("/healthz")
+    assert store.load(sid) == (payload, expires)
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+from slots import IntervalIndex
+
+
+def at(hour, minute=0, day=2):
+    return datetime(2024, 1, day, hour, minute)
+
+
+def interval_index(*bounds):
+    return IntervalIndex((at(*start), at(*end), None) for start, end in bounds)
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ((8,), (9,), False),           # se termine quand le premier commence
+    ((8,), (9, 1), True),
+    ((9, 30), (9, 45), True),      # contenu dans [9:00, 10:00)
+    ((10,), (11,), False),         # commence quand le premier finit
+    ((10,), (14,), False),         # dans le trou entre les deux
+    ((13, 59), (14, 1), True),
+    ((15,), (16,), False),         # après le dernier
+])
+def test_overlaps_half_open(start, end, expected):
+    index = interval_index(((9,), (10,)), ((14,), (15,)))
+    assert index.overlaps(at(*start), at(*end)) is expected
+
+
+def test_overlaps_uses_longest_earlier_interval():
+    # Un long intervalle suivi d'un court : le maximum cumulé des fins doit le voir
+    index = interval_index(((8,), (18,)), ((9,), (9, 30)))
+    assert index.overlaps(at(12), at(13))
+
+
+def test_empty_and_degenerate_intervals_are_ignored():
+    assert not IntervalIndex().overlaps(at(0), at(23))
+    index = interval_index(((9,), (9,)), ((11,), (10,)))
+    assert len(index) == 0
+    assert not index.overlaps(at(8), at(12))
+
+
+def test_add_keeps_order_and_running_maximum():
+    index = interval_index(((14,), (15,)))
+    index.add(at(8), at(12))
+    index.add(at(9), at(10))
+    index.add(at(16), at(16))
+    assert len(index) == 3
+    assert index.overlaps(at(11), at(11, 30))
+    assert not index.overlaps(at(12), at(14))
+    assert [start for start, _, _ in index.starting_between()] == [at(8), at(9), at(14)]
+
+
+def test_add_after_overlap_check_books_the_slot():
+    index = IntervalIndex()
+    assert not index.overlaps(at(9), at(9, 30))
+    index.add(at(9), at(9, 30))
+    assert index.overlaps(at(9), at(9, 30))
+    assert not index.overlaps(at(9, 30), at(10))
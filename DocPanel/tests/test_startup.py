@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import httpx
+import pytest
+
+import app
+from fake_supabase import FakeQuery, FakeSupabase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_opens_no_connection():
+    # Processus neuf : toute résolution DNS ou connexion à l'import échoue
+    script = textwrap.dedent("""
+        import socket
+
+        def offline(*args, **kwargs):
+            raise AssertionError("appel réseau à l'import")
+
+        socket.getaddrinfo = offline
+        socket.create_connection = offline
+        socket.socket.connect = offline
+
+        import app
+        assert app._db is None
+    """)
+    env = dict(os.environ, SUPABASE_URL="http://db.tests.invalid", SESSION_BACKEND="memory")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+class DownQuery(FakeQuery):
+    def execute(self):
+        self.backend.calls += 1
+        raise httpx.ConnectError("connexion refusée")
+
+
+class DownSupabase(FakeSupabase):
+    query_class = DownQuery
+
+
+@pytest.fixture
+def database_down(db, monkeypatch):
+    backend = DownSupabase()
+    app.use_data_backend(backend)
+    monkeypatch.setattr(app, "_ready_state", (0.0, None))
+    monkeypatch.setattr(app, "READY_CHECK_TTL", 60)
+    return backend
+
+
+def test_healthz_stays_up_without_database(database_down):
+    response = app.app.test_client().get("/healthz")
+    assert response.status_code == 200 and response.get_json() == {"status": "ok"}
+    assert database_down.calls == 0
+
+
+def test_readyz_reports_and_caches_the_failure(database_down, monkeypatch):
+    client = app.app.test_client()
+    for _ in range(3):
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.get_json()["status"] == "indisponible"
+    assert database_down.calls == 1
+
+    # Passé READY_CHECK_TTL, la base est recontrôlée
+    checked_at, error = app._ready_state
+    monkeypatch.setattr(app, "_ready_state", (checked_at - 61, error))
+    assert client.get("/readyz").status_code == 503
+    assert database_down.calls == 2
+
+
+def test_readyz_recovers_once_the_database_answers(database_down, monkeypatch):
+    client = app.app.test_client()
+    assert client.get("/readyz").status_code == 503
+    app.use_data_backend(FakeSupabase())
+    monkeypatch.setattr(app, "_ready_state", (0.0, None))
+    assert client.get("/readyz").status_code == 200
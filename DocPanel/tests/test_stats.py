@@ -0,0 +1,64 @@
+import json
+from datetime import date, timedelta
+
+import httpx
+from postgrest.utils import SyncClient
+
+import app
+
+
+def mock_client(handler):
+    """Vrai client PostgREST de l'application, transport HTTP simulé."""
+    client = app.PooledPostgrestClient("http://tests.invalid/rest/v1", headers={"apikey": "k"})
+    client.session = SyncClient(base_url="http://tests.invalid/rest/v1", transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_stats_counts_survive_the_real_client():
+    methods = []
+
+    def handler(request):
+        methods.append(request.method)
+        assert "count=exact" in request.headers["prefer"]
+        body = b"" if request.method == "HEAD" else json.dumps([{"id": 1}]).encode()
+        return httpx.Response(200, content=body, headers={"Content-Range": "0-0/42"})
+
+    queries = app.stats_queries(mock_client(handler), "d1")
+    counts = {name: query.execute().count for name, query in queries.items()}
+    assert counts == {name: 42 for name in queries}
+    assert set(methods) == {"GET"}
+
+
+def test_stats_route_counts_by_status(client, db):
+    today = date.today()
+    db.seed("users", [{"id": 1, "calendar": {"2024-01-01": [], "2024-01-08": [], "recurrence": {"rules": []}}}])
+    db.seed("patients", [
+        {"id": i, "doctor_id": 1, "status": status, "patient_date_reservation": day.isoformat()}
+        for i, (status, day) in enumerate([
+            ("reserved", today), ("reserved", today - timedelta(days=30)),
+            ("confirmed", today), ("rescheduled", today + timedelta(days=60)),
+            ("cancelled", today), (None, today),
+        ])
+    ] + [{"id": 99, "doctor_id": 2, "status": "reserved", "patient_date_reservation": today.isoformat()}])
+
+    # Sans statut : « reserved », comme sur le calendrier
+    stats = client.get("/api/stats").get_json()
+    assert stats == {
+        "total_patients": 6,
+        "appointments": 5,
+        "by_status": {"reserved": 3, "confirmed": 1, "rescheduled": 1, "cancelled": 1},
+        "upcoming_week": 3,
+        "weeks_programmed": 2,
+    }
+
+    # Servi depuis le cache, puis recalculé après une écriture
+    calls = db.calls
+    assert client.get("/api/stats").get_json() == stats
+    assert db.calls == calls
+    client.post("/api/confirm_reservation/0")
+    assert client.get("/api/stats").get_json()["by_status"]["confirmed"] == 2
+
+
+def test_stats_route_requires_login(db):
+    assert app.app.test_client().get("/api/stats").status_code == 401
+
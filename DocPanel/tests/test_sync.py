@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+import app
+
+
+def test_cursor_keeps_a_margin_behind_the_read():
+    now = datetime(2024, 1, 1, 10, 0, 10, tzinfo=timezone.utc)
+    changed = [{"id": "p1", "patient_date_reservation": "2024-01-02", "patient_time_reservation": "09:00:00",
+                "updated_at": "2024-01-01T10:00:08+00:00"}]
+    delta = app.build_delta("2024-01-01T10:00:00+00:00", changed, [], now)
+    assert delta["cursor"] == "2024-01-01T10:00:05+00:00"
+    assert delta["upserts"][0]["id"] == "patient_p1"
+
+
+def test_cursor_never_moves_backwards():
+    now = datetime(2024, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+    assert app.build_delta("2024-01-01T10:00:30+00:00", [], [], now)["cursor"] == "2024-01-01T10:00:30+00:00"
+
+
+def test_rows_sharing_a_timestamp_are_not_lost(seed_patient):
+    # Confirmation et report d'un même lot : même updated_at, écrits de part et d'autre d'une lecture
+    stamp = datetime.now(timezone.utc).isoformat()
+    since = app.sync_cursor(datetime.now(timezone.utc) - timedelta(minutes=1))
+    seed_patient("p1", doctor_id="d1", updated_at=stamp)
+    first = app.fetch_delta("d1", since)
+    assert [e["id"] for e in first["upserts"]] == ["patient_p1"]
+
+    seed_patient("p2", time="10:00:00", doctor_id="d1", updated_at=stamp)
+    second = app.fetch_delta("d1", first["cursor"])
+    assert "patient_p2" in [e["id"] for e in second["upserts"]]
+
+
+def test_late_commit_with_earlier_timestamp_is_picked_up(seed_patient):
+    since = app.sync_cursor(datetime.now(timezone.utc) - timedelta(minutes=1))
+    cursor = app.fetch_delta("d1", since)["cursor"]
+    late = (datetime.now(timezone.utc) - timedelta(seconds=2)).isoformat()
+    seed_patient("p3", doctor_id="d1", updated_at=late)
+    assert [e["id"] for e in app.fetch_delta("d1", cursor)["upserts"]] == ["patient_p3"]
+
+
+def test_naive_cursor_is_read_as_utc():
+    assert app.parse_sync_cursor("2024-01-01T10:00:00") == "2024-01-01T10:00:00+00:00"
+    assert app.parse_sync_cursor("2024-01-01T10:00:00 01:00") == "2024-01-01T10:00:00+01:00"
+    assert app.parse_sync_cursor("garbage") is None
+
+
+def test_events_since_returns_upserts_and_deletions(client, seed_patient):
+    seed_patient(10)
+    seed_patient(11)
+    since = app.sync_cursor()
+    response = client.post("/api/reservations/batch", json={"operations": [
+        {"action": "confirm", "patient_id": 10},
+        {"action": "delete", "patient_id": 11},
+    ]})
+    assert response.status_code == 200
+
+    delta = client.get("/api/events", query_string={"since": since}).get_json()
+    assert [event["id"] for event in delta["upserts"]] == ["patient_10"]
+    assert delta["deleted"] == ["patient_11"]
+    assert delta["cursor"] >= since and not delta["reset"]
+
+
+def test_events_since_rejects_invalid_cursor(client, db):
+    assert client.get("/api/events?since=hier").status_code == 400
+
+
+def test_stream_sends_patch_then_retry(client, seed_patient):
+    stamp = datetime.now(timezone.utc).isoformat()
+    seed_patient(10, updated_at=stamp)
+    seed_patient(11, updated_at=stamp)
+    since = app.sync_cursor(datetime.now(timezone.utc) - timedelta(minutes=1))
+    response = client.get("/api/events/stream", headers={"Last-Event-ID": since})
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert body.startswith("event: patch\n")
+    assert "patient_10" in body and "patient_11" in body
+    assert body.endswith(f"retry: {app.SSE_POLL_RETRY_MS}\n\n")
+
+
+def test_stream_without_changes_only_sets_retry(client, db):
+    response = client.get("/api/events/stream")
+    assert response.get_data(as_text=True) == f"retry: {app.SSE_POLL_RETRY_MS}\n\n"
+
+
+def test_stream_requires_login(db):
+    assert app.app.test_client().get("/api/events/stream").status_code == 401
+
+
+
+def test_writes_from_other_clients_reach_the_feed(client, db, seed_patient):
+    # Application patients : ni updated_at ni pierre tombale, les déclencheurs s'en chargent
+    seed_patient(10)
+    seed_patient(11)
+    since = app.sync_cursor()
+    db.table("patients").update({"status": "reserved"}).eq("id", 10).execute()
+    db.table("patients").delete().eq("id", 11).execute()
+
+    delta = client.get("/api/events", query_string={"since": since}).get_json()
+    assert [event["id"] for event in delta["upserts"]] == ["patient_10"]
+    assert delta["deleted"] == ["patient_11"]